@@ -0,0 +1,168 @@
+"""Evaluation of many positions in one call with NumPy. Positions are
+stacked as the 12 piece bitboards of each (white pawn to king, then
+black), and the same terms as evaluation.evaluate() are computed for
+all of them at once: material and piece-square tables from 12x64 piece
+planes, mobility from attack sets built with shifts of the bitboards.
+
+    python batch_eval.py games.pgn
+"""
+import argparse
+import time
+import numpy as np
+import chesspiece
+import pgn
+from chessboard import ChessBoard
+from evaluation import evaluate, PIECE_VALUES, PIECE_SQUARES, MOBILITY_WEIGHT
+
+FULL = (1 << 64) - 1
+FILE_A = 0x0101010101010101
+NOT_A = np.uint64(FULL & ~FILE_A)
+NOT_AB = np.uint64(FULL & ~(FILE_A | FILE_A << 1))
+NOT_H = np.uint64(FULL & ~(FILE_A << 7))
+NOT_GH = np.uint64(FULL & ~(FILE_A << 6 | FILE_A << 7))
+ALL = np.uint64(FULL)
+
+# (shift, mask of the tiles a shift can land on without wrapping),
+# positive shifts going up the board
+ROOK_SHIFTS = ((8, ALL), (-8, ALL), (1, NOT_A), (-1, NOT_H))
+BISHOP_SHIFTS = ((9, NOT_A), (7, NOT_H), (-7, NOT_A), (-9, NOT_H))
+KING_SHIFTS = ROOK_SHIFTS + BISHOP_SHIFTS
+KNIGHT_SHIFTS = ((17, NOT_A), (15, NOT_H), (10, NOT_AB), (6, NOT_GH),
+                 (-6, NOT_AB), (-10, NOT_GH), (-15, NOT_A), (-17, NOT_H))
+PAWN_SHIFTS = (((9, NOT_A), (7, NOT_H)), ((-7, NOT_A), (-9, NOT_H)))
+
+
+def _square_values() -> np.ndarray:
+    """Material plus piece-square value of every piece plane and tile,
+    negative for black
+    """
+    values = np.zeros((12, 64), dtype=np.int32)
+    for kind in range(6):
+        for sq in range(64):
+            values[kind, sq] = PIECE_VALUES[kind] + PIECE_SQUARES[kind][sq]
+            values[6 + kind, sq] = -(PIECE_VALUES[kind] +
+                                     PIECE_SQUARES[kind][sq ^ 56])
+    return values
+
+
+SQUARE_VALUES = _square_values()
+
+
+def encode(boards: list) -> tuple:
+    """Stacks the piece bitboards of ChessBoards into an (N, 12) uint64
+    array, with a boolean array of white to move
+    """
+    bitboards = np.array([board.bitboards.pieces[0] + board.bitboards.pieces[1]
+                          for board in boards], dtype=np.uint64)
+    white_to_move = np.array([board.turn == "W" for board in boards],
+                             dtype=bool)
+    return bitboards.reshape(len(boards), 12), white_to_move
+
+
+def planes(bitboards: np.ndarray) -> np.ndarray:
+    """(N, 12) bitboards to (N, 12, 64) piece planes of 0 and 1
+    """
+    as_bytes = bitboards.astype("<u8").view(np.uint8)
+    return np.unpackbits(as_bytes.reshape(len(bitboards), 12, 8), axis=2,
+                         bitorder="little")
+
+
+def _shift(bitboards: np.ndarray, amount: int, mask: np.uint64) -> np.ndarray:
+    if amount > 0:
+        return (bitboards << np.uint64(amount)) & mask
+    return (bitboards >> np.uint64(-amount)) & mask
+
+
+def _popcount(bitboards: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bitboards).astype(np.int32)
+    as_bytes = bitboards.astype("<u8").view(np.uint8)
+    return np.unpackbits(as_bytes.reshape(len(bitboards), 8),
+                         axis=1).sum(axis=1, dtype=np.int32)
+
+
+def attacks(bitboards: np.ndarray, side: int) -> np.ndarray:
+    """Tiles attacked by the pieces of the color code side, like
+    ChessBoard.attacks. Sliding attacks stop at the first piece.
+    """
+    pawns, knights, bishops, rooks, queens, kings = \
+        (bitboards[:, side * 6 + kind] for kind in range(6))
+    empty = ~np.bitwise_or.reduce(bitboards, axis=1)
+    found = np.zeros(len(bitboards), dtype=np.uint64)
+    for amount, mask in PAWN_SHIFTS[side]:
+        found |= _shift(pawns, amount, mask)
+    for amount, mask in KNIGHT_SHIFTS:
+        found |= _shift(knights, amount, mask)
+    for amount, mask in KING_SHIFTS:
+        found |= _shift(kings, amount, mask)
+    for sliders, shifts in ((bishops | queens, BISHOP_SHIFTS),
+                            (rooks | queens, ROOK_SHIFTS)):
+        for amount, mask in shifts:
+            flood = sliders
+            for _ in range(6):
+                flood = flood | (_shift(flood, amount, mask) & empty)
+            found |= _shift(flood, amount, mask)
+    return found
+
+
+def evaluate_encoded(bitboards: np.ndarray,
+                     white_to_move: np.ndarray) -> np.ndarray:
+    """Scores of encoded positions for the side to move, equal to
+    evaluation.evaluate() of each position
+    """
+    if not len(bitboards):
+        return np.zeros(0, dtype=np.int32)
+    scores = np.einsum("npk,pk->n", planes(bitboards).astype(np.int32),
+                       SQUARE_VALUES)
+    for side, sign in ((0, 1), (1, -1)):
+        own = np.bitwise_or.reduce(bitboards[:, side * 6:side * 6 + 6],
+                                   axis=1)
+        mobility = _popcount(attacks(bitboards, side) & ~own)
+        scores += sign * MOBILITY_WEIGHT * mobility
+    return np.where(white_to_move, scores, -scores)
+
+
+def evaluate_batch(boards: list) -> np.ndarray:
+    """Scores of ChessBoards for their side to move
+    """
+    return evaluate_encoded(*encode(boards))
+
+
+def game_positions(path: str) -> tuple:
+    """Encodes every position of the games in a PGN file. Returns the
+    bitboards, the side to move and the scalar evaluations for checking.
+    """
+    rows = []
+    turns = []
+    scores = []
+    with open(path, encoding="utf-8", errors="replace") as pgn_file:
+        for game in pgn.read_games(pgn_file):
+            board = ChessBoard(game["tags"].get("FEN", chesspiece.START_FEN))
+            board.make_board()
+            try:
+                for san in game["moves"]:
+                    board.make_move(*pgn.san_to_move(board, san))
+                    rows.append(board.bitboards.pieces[0] +
+                                board.bitboards.pieces[1])
+                    turns.append(board.turn == "W")
+                    scores.append(evaluate(board))
+            except ValueError as _:
+                continue
+    return (np.array(rows, dtype=np.uint64).reshape(len(rows), 12),
+            np.array(turns, dtype=bool), scores)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score every position of "
+                                                 "a PGN file in one batch")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    bitboards, white_to_move, scalar_scores = game_positions(args.path)
+    start = time.perf_counter()
+    scores = evaluate_encoded(bitboards, white_to_move)
+    elapsed = time.perf_counter() - start
+    rate = len(scores) / elapsed if elapsed > 0 else 0
+    print(f"{len(scores)} positions in {elapsed:.3f} s, {rate:.0f} positions/s")
+    mismatches = int(np.count_nonzero(scores != np.array(scalar_scores)))
+    print(f"{mismatches} differences to evaluation.evaluate()")
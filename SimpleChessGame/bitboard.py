@@ -0,0 +1,138 @@
+import copy
+from typing import Iterator
+from movetables import (BISHOP_DIRECTIONS, ROOK_DIRECTIONS, QUEEN_DIRECTIONS,
+                        KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS,
+                        RAY_SQUARES)
+
+# color and piece type codes, also used as indexes of the bitboards
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+COLORS = ("W", "B")
+PIECE_TYPES = ("pawn", "knight", "bishop", "rook", "queen", "king")
+COLOR_INDEX = {color: index for index, color in enumerate(COLORS)}
+SLIDES = {BISHOP: BISHOP_DIRECTIONS,
+          ROOK: ROOK_DIRECTIONS,
+          QUEEN: QUEEN_DIRECTIONS}
+SLIDER_TYPES = tuple(SLIDES)
+
+
+def position(sq: int) -> tuple:
+    return sq >> 3, sq & 7
+
+
+def iter_squares(bitboard: int) -> Iterator[int]:
+    """Yields the square indexes of set bits, lowest first
+    """
+    while bitboard:
+        low_bit = bitboard & -bitboard
+        yield low_bit.bit_length() - 1
+        bitboard ^= low_bit
+
+
+def attacks(kind: int, side: int, sq: int, occupied: int) -> int:
+    """Bitboard of the tiles a piece of type and color code on sq
+    attacks. Sliding pieces stop at the first occupied tile, which
+    is included
+    """
+    if kind == PAWN:
+        return PAWN_ATTACKS[side][sq]
+    if kind == KNIGHT:
+        return KNIGHT_ATTACKS[sq]
+    if kind == KING:
+        return KING_ATTACKS[sq]
+    mask = 0
+    for direction in SLIDES[kind]:
+        for trgt_sq in RAY_SQUARES[direction][sq]:
+            bit = 1 << trgt_sq
+            mask |= bit
+            if occupied & bit:
+                break
+    return mask
+
+
+class BitBoards():
+    """Position stored as one 64-bit integer per piece type and color
+    with occupancy masks for both colors and the whole board.
+
+    pieces[color][type] is indexed by the color and type codes, and so
+    is piece_lists[color][type], the piece objects on the board, so
+    the pieces of a color are found without visiting the empty tiles
+    """
+
+    def __init__(self):
+        self.pieces = [[0] * len(PIECE_TYPES) for _ in COLORS]
+        self.piece_lists = [[[] for _ in PIECE_TYPES] for _ in COLORS]
+        self.occupied = [0, 0]
+        self.all = 0
+
+    def add(self, piece, sq: int):
+        mask = 1 << sq
+        self.pieces[piece.side][piece.KIND] |= mask
+        self.piece_lists[piece.side][piece.KIND].append(piece)
+        self.occupied[piece.side] |= mask
+        self.all |= mask
+
+    def remove(self, piece, sq: int):
+        mask = ~(1 << sq)
+        self.pieces[piece.side][piece.KIND] &= mask
+        # a moving piece is briefly on both tiles, either copy can go
+        self.piece_lists[piece.side][piece.KIND].remove(piece)
+        self.occupied[piece.side] &= mask
+        self.all &= mask
+
+    def pieces_of(self, color: str) -> list:
+        """Piece objects of one color, by type from pawns to the king
+        """
+        return [piece for kind_list in self.piece_lists[COLOR_INDEX[color]]
+                for piece in kind_list]
+
+    def king_position(self, color: str):
+        king = self.pieces[COLOR_INDEX[color]][KING]
+        if king:
+            return position(king.bit_length() - 1)
+        return None
+
+
+class BoardRow(list):
+    """One row of the board. Behaves like a plain list but writes
+    are mirrored into the bitboards of the parent BoardState
+    """
+
+    def __init__(self, iterable, bitboards: BitBoards, row: int):
+        super().__init__(iterable)
+        self.bitboards = bitboards
+        self.row = row
+
+    def __setitem__(self, col: int, piece):
+        sq = self.row * 8 + col
+        old_piece = list.__getitem__(self, col)
+        if old_piece is not None:
+            self.bitboards.remove(old_piece, sq)
+        if piece is not None:
+            self.bitboards.add(piece, sq)
+        list.__setitem__(self, col, piece)
+
+
+class BoardState(list):
+    """8x8 list view of the bitboard backend. Reading works exactly
+    like the old nested lists, so state[row][col] still returns a piece
+    or None, and writing through state[row][col] keeps the bitboards
+    in sync.
+    """
+
+    def __init__(self, rows: list, board=None):
+        self.bitboards = BitBoards()
+        self.board = board
+        super().__init__(BoardRow(row, self.bitboards, index)
+                         for index, row in enumerate(rows))
+        for index, row in enumerate(rows):
+            for col, piece in enumerate(row):
+                if piece is not None:
+                    self.bitboards.add(piece, index * 8 + col)
+
+    def __deepcopy__(self, memo: dict):
+        """Copies are detached from the owning ChessBoard but keep
+        their own bitboards, so temporary boards still work
+        """
+        rows = [[copy.deepcopy(piece, memo) for piece in row] for row in self]
+        return BoardState(rows)
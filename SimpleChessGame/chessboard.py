@@ -1,18 +1,96 @@
 import pieces
 from typing import Tuple, Any
 import chesspiece
-from colorama import Fore, Back, Style
+from bitboard import (BoardState, iter_squares, attacks, position,
+                      COLORS, COLOR_INDEX, SLIDER_TYPES, WHITE, BLACK, PAWN,
+                      KNIGHT, BISHOP, ROOK, QUEEN, KING)
+from fen import parse_fen, FEN_LETTERS, CASTLING_LETTERS, LETTERS
+from movetables import (PROMOTION_ROW, PAWN_START_ROW, ROOK_DIRECTIONS,
+                        QUEEN_DIRECTIONS,
+                        KING_TARGETS, KNIGHT_ATTACKS, KING_ATTACKS,
+                        PAWN_ATTACKS, RAY_SQUARES, BETWEEN)
+from transposition import TranspositionTable, shared_table
+from zobrist import (PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS,
+                     hash_position)
+from renderer import BoardRenderer, format_line
+from events import EventHub, print_event
+
+# castling right bits, and the rights lost when a piece moves from or
+# to a square (the king and rook starting squares)
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+CASTLING_SQUARES = {0: WHITE_QUEENSIDE, 4: WHITE_KINGSIDE | WHITE_QUEENSIDE,
+                    7: WHITE_KINGSIDE, 56: BLACK_QUEENSIDE,
+                    60: BLACK_KINGSIDE | BLACK_QUEENSIDE, 63: BLACK_KINGSIDE}
+# starting tiles of the king and the rook of each castling right
+CASTLING_PIECES = {WHITE_KINGSIDE: ((0, 4), (0, 7)),
+                   WHITE_QUEENSIDE: ((0, 4), (0, 0)),
+                   BLACK_KINGSIDE: ((7, 4), (7, 7)),
+                   BLACK_QUEENSIDE: ((7, 4), (7, 0))}
+
+
+class MoveRecord():
+    """Undo information for one move made with ChessBoard.make_move().
+    flags holds (piece, attribute, old value) for every piece flag the
+    move changed.
+    """
+    __slots__ = ("origin", "target", "piece", "captured", "captured_at",
+                 "en_passant", "castling", "hash", "halfmove", "rook_move",
+                 "promoted", "flags", "attacks")
+
+    def __init__(self, origin: tuple, target: tuple, piece: object,
+                 captured: object, en_passant: tuple, castling: int,
+                 hash: int, halfmove: int):
+        self.origin = origin
+        self.target = target
+        self.piece = piece
+        self.captured = captured
+        self.captured_at = target
+        self.en_passant = en_passant
+        self.castling = castling
+        self.hash = hash
+        self.halfmove = halfmove
+        self.rook_move = None
+        self.promoted = None
+        self.flags = []
+        self.attacks = None
+
+    def set_flag(self, piece: object, key: str, value: Any):
+        self.flags.append((piece, key, getattr(piece, key)))
+        setattr(piece, key, value)
 
 
 class ChessBoard():
+    """The chess position and its game state. chesspieces is either
+    a dictionary like chesspiece.chesspieces or a FEN string. What
+    happens in the game is emitted to the subscribers of events.
+    """
 
-    def __init__(self, chesspieces):
+    PROMOTIONS = (pieces.Queen, pieces.Rook, pieces.Bishop, pieces.Knight)
+
+    def __init__(self, chesspieces, cache: TranspositionTable = None,
+                 events: EventHub = None):
         self.x = 8
         self.y = 8
         self.state = []
+        self.bitboards = None
+        # piece objects by color and type code, kept by the bitboards
+        self.piece_lists: list = None
         self.move: int = 1
         self.w_king: tuple = None
         self.b_king: tuple = None
+        self.turn: str = "W"
+        self.en_passant: tuple = None
+        self.castling: int = 0
+        self.halfmove: int = 0
+        self.hash: int = 0
+        self.history: list = []
+        # how many times each position hash has been on the board
+        self.position_counts: dict = {}
+        self.attacks: list = [0, 0]
+        self.piece_attacks: list = [0] * 64
+        self.cache = shared_table if cache is None else cache
+        self.renderer = BoardRenderer()
+        self.events = EventHub() if events is None else events
         self.initial_state = chesspieces
 
     def make_board(self):
@@ -20,28 +98,136 @@ class ChessBoard():
         calling assemble_pieces(). The rows are represented by
         y and columns by x. The list of chess pieces and None
         values representing empty board slots gets saved in self.state
+
+        self.state is a list view over the bitboard backend kept in
+        self.bitboards, which is updated on every write to the list
+        """
+        if isinstance(self.initial_state, str):
+            self.load_fen(self.initial_state)
+            return
+        layout = {tuple(map(int, key.split("_"))): piece
+                  for key, piece in self.initial_state.items()}
+        self._set_state(
+            [[self.assemble_pieces((y, x), layout.get((y, x)))
+              for x in range(self.x)] for y in range(self.y)])
+
+    def _set_state(self, rows: list):
+        self.state = BoardState(rows, self)
+        self.bitboards = self.state.bitboards
+        self.piece_lists = self.bitboards.piece_lists
+        self.history = []
+        self.castling = self.castling_rights()
+        self.hash = hash_position(self.state, self.turn, self.castling,
+                                  self.en_passant)
+        self.position_counts = {self.hash: 1}
+        self.reset_attacks()
+
+    def load_fen(self, fen: str):
+        """Sets up the position of a FEN string. Kings and rooks
+        without castling rights are marked as moved.
+        """
+        placement, turn, castling, en_passant, halfmove, fullmove = \
+            parse_fen(fen)
+        rows = [[None] * self.x for _ in range(self.y)]
+        self.w_king = self.b_king = None
+        for (row, col), p_type, color in placement:
+            piece = p_type(position=(row, col), color=color)
+            rows[row][col] = piece
+            if p_type is pieces.King:
+                if color == "W":
+                    self.w_king = row, col
+                else:
+                    self.b_king = row, col
+                piece.moved = True
+            elif p_type is pieces.Rook:
+                piece.moved = True
+            elif p_type is pieces.Pawn:
+                piece.moved = row != PAWN_START_ROW[piece.side]
+        if self.w_king is None or self.b_king is None:
+            raise ValueError(f"FEN without both kings: {fen}")
+
+        for right, tiles in CASTLING_PIECES.items():
+            if not castling & right:
+                continue
+            for row, col in tiles:
+                piece = rows[row][col]
+                if piece is not None and type(piece) in (pieces.King,
+                                                         pieces.Rook):
+                    piece.moved = False
+
+        if en_passant is not None:
+            passed_pawn = rows[3 if en_passant[0] == 2 else 4][en_passant[1]]
+            if passed_pawn is None or passed_pawn.KIND != PAWN:
+                en_passant = None
+            else:
+                passed_pawn.en_passant = True
+        self.turn = turn
+        self.en_passant = en_passant
+        self.halfmove = halfmove
+        self.move = fullmove * 2 - (1 if turn == "W" else 0)
+        self._set_state(rows)
+
+    def to_fen(self) -> str:
+        """FEN string of the current position
         """
-        self.state = [[self.assemble_pieces((y, x))
-                       for x in range(self.x)] for y in range(self.y)]
+        ranks = []
+        for row in range(self.y - 1, -1, -1):
+            rank = ""
+            empty = 0
+            for piece in self.state[row]:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                letter = FEN_LETTERS[type(piece)]
+                rank += letter.upper() if piece.side == WHITE else letter
+            if empty:
+                rank += str(empty)
+            ranks.append(rank)
+        castling = "".join(letter for letter, right in CASTLING_LETTERS
+                           if self.castling & right) or "-"
+        if self.en_passant is None:
+            en_passant = "-"
+        else:
+            en_passant = LETTERS[self.en_passant[1]] + \
+                str(self.en_passant[0] + 1)
+        return " ".join(("/".join(ranks), self.turn.lower(), castling,
+                         en_passant, str(self.halfmove),
+                         str((self.move + 1) // 2)))
+
+    def castling_rights(self) -> int:
+        """Castling rights from the moved flags: the king and the
+        rook are on their starting tiles and neither has moved
+        """
+        rights = 0
+        for side, row in ((WHITE, 0), (BLACK, 7)):
+            king = self.state[row][4]
+            if king is None or king.KIND != KING or king.side != side \
+                    or king.moved:
+                continue
+            for col in (0, 7):
+                rook = self.state[row][col]
+                if rook is not None and rook.KIND == ROOK and \
+                        rook.side == side and not rook.moved:
+                    rights |= CASTLING_SQUARES[row * 8 + col]
+        return rights
 
     def get_pieces(self) -> Tuple[list, list]:
-        white_list = []
-        black_list = []
-        for j in range(self.y-1, -1, -1):
-            for i in range(0, self.x):
-                if self.state[j][i] is not None:
-                    tile = self.state[j][i].get_info()
-                    if tile['color'] == "W":
-                        white_list.append(tile)
-                    else:
-                        black_list.append(tile)
-        return white_list, black_list
-
-    def assemble_pieces(self, y_x: tuple):
+        """Returns info of white and black pieces, from the 8th row
+        to the 1st. Only the pieces in the piece lists are visited.
+        """
+        def in_order(color: str) -> list:
+            return [piece.get_info() for piece in sorted(
+                self.bitboards.pieces_of(color),
+                key=lambda piece: (-piece.position[0], piece.position[1]))]
+
+        return in_order("W"), in_order("B")
+
+    def assemble_pieces(self, y_x: tuple, piece: dict):
         """Returns the chesspiece object initialized or None 
         """
-        comparison_key = "_".join((str(y_x[0]), str(y_x[1])))
-        piece = self.initial_state.get(comparison_key)
         if piece:
             if piece['type'] == pieces.King:
                 if piece['color'] == "W":
@@ -52,163 +238,501 @@ class ChessBoard():
         else:
             return None
 
-    def update_board(self, origin: tuple, target: tuple) -> Tuple[list, Any]:
-        """Updates the board with new piece locations,
-        keep track of position of both kings. Also, checks
-        if castling can be done. 
+    def make_move(self, origin: tuple, target: tuple,
+                  promotion: type = None) -> "MoveRecord":
+        """Makes the move in place without any checking. Castling moves
+        the rook too, en passant removes the passed pawn and a pawn
+        reaching the last row is promoted (to queen unless promotion
+        gives another piece class). The record needed by unmake_move()
+        is pushed to self.history and returned.
+        """
+        state = self.state
+        piece = state[origin[0]][origin[1]]
+        kind = piece.KIND
+        record = MoveRecord(origin, target, piece,
+                            state[target[0]][target[1]], self.en_passant,
+                            self.castling, self.hash, self.halfmove)
+        record.attacks = (self.piece_attacks, self.attacks)
+        origin_sq = origin[0] * 8 + origin[1]
+        target_sq = target[0] * 8 + target[1]
+        side = piece.side
+        key = self.hash ^ SIDE_KEY ^ PIECE_KEYS[side][kind][origin_sq]
+
+        # the pawn that could be taken en passant loses that chance
+        if self.en_passant is not None:
+            passed_row = 3 if self.en_passant[0] == 2 else 4
+            passed_pawn = state[passed_row][self.en_passant[1]]
+            if passed_pawn is not None and passed_pawn.KIND == PAWN:
+                record.set_flag(passed_pawn, 'en_passant', False)
+
+        if kind == PAWN and target == self.en_passant and \
+                record.captured is None:
+            record.captured_at = (origin[0], target[1])
+            record.captured = state[origin[0]][target[1]]
+            state[origin[0]][target[1]] = None
+        if record.captured is not None:
+            captured = record.captured
+            captured_at = record.captured_at
+            key ^= PIECE_KEYS[captured.side][captured.KIND][
+                captured_at[0] * 8 + captured_at[1]]
+
+        state[target[0]][target[1]] = piece
+        state[origin[0]][origin[1]] = None
+        piece.set_position(target)
+        if not piece.moved:
+            record.set_flag(piece, 'moved', True)
+        if self.en_passant is not None:
+            key ^= EN_PASSANT_KEYS[self.en_passant[1]]
+        self.en_passant = None
+
+        if kind == KING:
+            if piece.side == WHITE:
+                self.w_king = target
+            else:
+                self.b_king = target
+            if abs(target[1] - origin[1]) == 2:
+                if target[1] > origin[1]:
+                    rook_from, rook_to = (target[0], 7), (target[0], 5)
+                else:
+                    rook_from, rook_to = (target[0], 0), (target[0], 3)
+                rook = state[rook_from[0]][rook_from[1]]
+                state[rook_to[0]][rook_to[1]] = rook
+                state[rook_from[0]][rook_from[1]] = None
+                rook.set_position(rook_to)
+                if not rook.moved:
+                    record.set_flag(rook, 'moved', True)
+                record.rook_move = (rook, rook_from, rook_to)
+                key ^= PIECE_KEYS[side][ROOK][rook_from[0] * 8 + rook_from[1]]
+                key ^= PIECE_KEYS[side][ROOK][rook_to[0] * 8 + rook_to[1]]
+        elif kind == PAWN:
+            if abs(target[0] - origin[0]) == 2:
+                self.en_passant = ((origin[0] + target[0]) // 2, origin[1])
+                record.set_flag(piece, 'en_passant', True)
+                key ^= EN_PASSANT_KEYS[origin[1]]
+            elif target[0] == PROMOTION_ROW[side]:
+                promotion = promotion or pieces.Queen
+                record.promoted = promotion(target, COLORS[side])
+                state[target[0]][target[1]] = record.promoted
+                kind = record.promoted.KIND
+        key ^= PIECE_KEYS[side][kind][target_sq]
+
+        castling = self.castling
+        if castling:
+            castling &= ~(CASTLING_SQUARES.get(origin_sq, 0) |
+                          CASTLING_SQUARES.get(target_sq, 0))
+            if castling != self.castling:
+                key ^= CASTLING_KEYS[self.castling] ^ CASTLING_KEYS[castling]
+                self.castling = castling
+        self.hash = key
+        self.position_counts[key] = self.position_counts.get(key, 0) + 1
+        if piece.KIND == PAWN or record.captured is not None:
+            self.halfmove = 0
+        else:
+            self.halfmove += 1
+
+        changed = [origin, target, record.captured_at]
+        if record.rook_move is not None:
+            changed.extend(record.rook_move[1:])
+        self._update_attacks(changed)
+
+        self.turn = "B" if self.turn == "W" else "W"
+        self.history.append(record)
+        return record
+
+    def unmake_move(self):
+        """Takes back the latest move made by make_move()
+        """
+        record = self.history.pop()
+        state = self.state
+        origin, target, piece = record.origin, record.target, record.piece
+
+        if record.rook_move is not None:
+            rook, rook_from, rook_to = record.rook_move
+            state[rook_to[0]][rook_to[1]] = None
+            state[rook_from[0]][rook_from[1]] = rook
+            rook.set_position(rook_from)
+
+        state[target[0]][target[1]] = None
+        state[origin[0]][origin[1]] = piece
+        piece.set_position(origin)
+        if record.captured is not None:
+            captured_at = record.captured_at
+            state[captured_at[0]][captured_at[1]] = record.captured
+
+        for chesspiece, key, value in reversed(record.flags):
+            setattr(chesspiece, key, value)
+
+        if piece.KIND == KING:
+            if piece.side == WHITE:
+                self.w_king = origin
+            else:
+                self.b_king = origin
+        self.en_passant = record.en_passant
+        self.castling = record.castling
+        count = self.position_counts[self.hash] - 1
+        if count:
+            self.position_counts[self.hash] = count
+        else:
+            del self.position_counts[self.hash]
+        self.hash = record.hash
+        self.halfmove = record.halfmove
+        self.piece_attacks, self.attacks = record.attacks
+        self.turn = "B" if self.turn == "W" else "W"
+
+    def reset_attacks(self):
+        """Builds the attacked tile maps of both colors from scratch.
+        piece_attacks holds the attacks of the piece on each of the 64
+        squares and attacks the union of them for each color.
+        """
+        self.piece_attacks = [0] * 64
+        occupied = self.bitboards.all
+        for sq in iter_squares(occupied):
+            row, col = position(sq)
+            piece = self.state[row][col]
+            self.piece_attacks[sq] = attacks(
+                piece.KIND, piece.side, sq, occupied)
+        self._combine_attacks()
+
+    def _update_attacks(self, changed: list):
+        """Updates the attack maps after the pieces on the changed tiles
+        moved. Only those tiles and the sliding pieces whose lines went
+        through them are recomputed.
+        """
+        piece_attacks = list(self.piece_attacks)
+        bitboards = self.bitboards
+        occupied = bitboards.all
+        changed_mask = 0
+        for row, col in changed:
+            changed_mask |= 1 << (row * 8 + col)
+        sliders = 0
+        for color_pieces in bitboards.pieces:
+            for p_type in SLIDER_TYPES:
+                sliders |= color_pieces[p_type]
+
+        dirty = changed_mask
+        for sq in iter_squares(sliders & ~changed_mask):
+            if piece_attacks[sq] & changed_mask:
+                dirty |= 1 << sq
+        for sq in iter_squares(dirty):
+            piece = self.state[sq >> 3][sq & 7]
+            if piece is None:
+                piece_attacks[sq] = 0
+            else:
+                piece_attacks[sq] = attacks(
+                    piece.KIND, piece.side, sq, occupied)
+        self.piece_attacks = piece_attacks
+        self._combine_attacks()
+
+    def _combine_attacks(self):
+        piece_attacks = self.piece_attacks
+        combined = []
+        for occupied in self.bitboards.occupied:
+            color_attacks = 0
+            for sq in iter_squares(occupied):
+                color_attacks |= piece_attacks[sq]
+            combined.append(color_attacks)
+        self.attacks = combined
+
+    def is_attacked(self, tile: tuple, color: str) -> bool:
+        """Is the tile attacked by any piece of the given color
+        """
+        return bool(self.attacks[COLOR_INDEX[color]] >>
+                    (tile[0] * 8 + tile[1]) & 1)
+
+    def attackers(self, tile: tuple, color: str) -> list:
+        """Positions of the pieces of the given color attacking the tile
+        """
+        mask = 1 << (tile[0] * 8 + tile[1])
+        return [position(sq) for sq in
+                iter_squares(self.bitboards.occupied[COLOR_INDEX[color]])
+                if self.piece_attacks[sq] & mask]
+
+    def cached(self, tag: tuple, compute, *args) -> Any:
+        """Returns compute(*args) for the current position, from the
+        cache when the same position and tag have been computed before
+        """
+        key = (self.hash,) + tag
+        value = self.cache.lookup(key)
+        if value is None:
+            value = compute(*args)
+            self.cache.store(key, value)
+        return value
+
+    def legal_moves(self, color: str = None) -> tuple:
+        """Legal moves of the color, by default the side to move, as
+        (origin, target, promotion) tuples. promotion is None or the
+        piece class for pawns reaching the last row, which get one move
+        per promotion piece. Cached by position hash, and a tuple since
+        the boards sharing the cache get the same one.
+        """
+        color = color or self.turn
+        return self.cached(("moves", color), self.generate_legal_moves, color)
+
+    def any_legal_move(self, color: str = None) -> bool:
+        """Whether the color, by default the side to move, has a legal
+        move. Stops at the first one found, usually a king move.
+        """
+        color = color or self.turn
+        return next(self.iter_legal_moves(color), None) is not None
+
+    def generate_legal_moves(self, color: str) -> tuple:
+        """All moves of iter_legal_moves() as a tuple
+        """
+        return tuple(self.iter_legal_moves(color))
+
+    def iter_legal_moves(self, color: str):
+        """Yields the legal moves from the checking and pinned pieces of
+        the position, king moves first. In check only evasions are
+        generated: moves of the king, taking the checking piece or
+        moving in between it and the king. Pinned pieces only move
+        along the line of the pin.
+        """
+        side = COLOR_INDEX[color]
+        enemy = 1 - side
+        state = self.state
+        bitboards = self.bitboards
+        occupied = bitboards.all
+        own = bitboards.occupied[side]
+        king_sq = bitboards.pieces[side][KING].bit_length() - 1
+        king_at = position(king_sq)
+        checkers = self.attackers_to(king_sq, enemy, occupied)
+
+        # king moves are tested with the king taken off the board, so
+        # it cannot step back along the line of a sliding attack
+        without_king = occupied & ~(1 << king_sq)
+        blocked = own | bitboards.pieces[enemy][KING]
+        for target in KING_TARGETS[king_sq]:
+            trgt_sq = target[0] * 8 + target[1]
+            if blocked >> trgt_sq & 1:
+                continue
+            if not self.attackers_to(trgt_sq, enemy, without_king):
+                yield king_at, target, None
+        # in double check only the king can move
+        if checkers & (checkers - 1):
+            return
+
+        if checkers:
+            checker_sq = checkers.bit_length() - 1
+            evasions = checkers | BETWEEN[king_sq][checker_sq]
+        else:
+            evasions = ~own
+            yield from self._castling_moves(side)
+        pins = self.pinned_pieces(side, king_sq)
+        promotion_row = PROMOTION_ROW[side]
+        enemy_king = bitboards.pieces[enemy][KING]
+
+        for sq in iter_squares(own & ~(1 << king_sq)):
+            piece = state[sq >> 3][sq & 7]
+            origin = piece.position
+            allowed = evasions & pins.get(sq, -1) & ~enemy_king
+            for target in piece._iter_moves(state):
+                if piece.KIND == PAWN and target == self.en_passant:
+                    if self._en_passant_is_legal(origin, target, side,
+                                                 king_sq):
+                        yield origin, target, None
+                    continue
+                if not allowed >> (target[0] * 8 + target[1]) & 1:
+                    continue
+                if piece.KIND == PAWN and target[0] == promotion_row:
+                    for promotion in self.PROMOTIONS:
+                        yield origin, target, promotion
+                else:
+                    yield origin, target, None
+
+    def attackers_to(self, sq: int, side: int, occupied: int) -> int:
+        """Bitboard of the pieces of the color code side attacking the
+        square. Sliding attacks go through the given occupancy, so
+        pieces can be left out of it.
+        """
+        enemy = self.bitboards.pieces[side]
+        found = (PAWN_ATTACKS[1 - side][sq] & enemy[PAWN] |
+                 KNIGHT_ATTACKS[sq] & enemy[KNIGHT] |
+                 KING_ATTACKS[sq] & enemy[KING])
+        diagonal = enemy[BISHOP] | enemy[QUEEN]
+        if diagonal:
+            found |= attacks(BISHOP, side, sq, occupied) & diagonal
+        straight = enemy[ROOK] | enemy[QUEEN]
+        if straight:
+            found |= attacks(ROOK, side, sq, occupied) & straight
+        return found
+
+    def pinned_pieces(self, side: int, king_sq: int) -> dict:
+        """Pieces of the color code side pinned to their king, as
+        square: mask of the tiles on the line of the pin, up to and
+        including the pinning piece
+        """
+        bitboards = self.bitboards
+        enemy = bitboards.pieces[1 - side]
+        occupied = bitboards.all
+        own = bitboards.occupied[side]
+        pins = {}
+        for direction in QUEEN_DIRECTIONS:
+            if direction in ROOK_DIRECTIONS:
+                sliders = enemy[ROOK] | enemy[QUEEN]
+            else:
+                sliders = enemy[BISHOP] | enemy[QUEEN]
+            if not sliders:
+                continue
+            line = 0
+            pinned = None
+            for sq in RAY_SQUARES[direction][king_sq]:
+                bit = 1 << sq
+                line |= bit
+                if not occupied & bit:
+                    continue
+                if pinned is None and own & bit:
+                    pinned = sq
+                    continue
+                if pinned is not None and sliders & bit:
+                    pins[pinned] = line
+                break
+        return pins
+
+    def _castling_moves(self, side: int) -> list:
+        """Castling moves of the color code side, which is not in
+        check. The tiles between the king and the rook must be empty
+        and the king cannot pass or land on an attacked tile.
+        """
+        if side == WHITE:
+            rights = ((WHITE_KINGSIDE, 7, 1), (WHITE_QUEENSIDE, 0, -1))
+        else:
+            rights = ((BLACK_KINGSIDE, 7, 1), (BLACK_QUEENSIDE, 0, -1))
+        row = 0 if side == WHITE else 7
+        occupied = self.bitboards.all
+        king_sq = row * 8 + 4
+        moves = []
+        for right, col_rook, step in rights:
+            if not self.castling & right:
+                continue
+            if occupied & BETWEEN[king_sq][row * 8 + col_rook]:
+                continue
+            if self.attackers_to(king_sq + step, 1 - side, occupied) or \
+                    self.attackers_to(king_sq + 2 * step, 1 - side, occupied):
+                continue
+            moves.append(((row, 4), (row, 4 + 2 * step), None))
+        return moves
+
+    def _en_passant_is_legal(self, origin: tuple, target: tuple,
+                             side: int, king_sq: int) -> bool:
+        """En passant takes two pieces off the same row, which can
+        uncover the king in ways the pins do not show, so the move is
+        made and taken back
+        """
+        self.make_move(origin, target)
+        legal = not self.attackers_to(king_sq, 1 - side, self.bitboards.all)
+        self.unmake_move()
+        return legal
+
+    def update_board(self, origin: tuple, target: tuple,
+                     promotion: type = None,
+                     skip_print: bool = False) -> Tuple[list, Any]:
+        """Updates the board with new piece locations by calling
+        make_move(), which also keeps track of both kings and does
+        the castling, en passant and promotion changes. Pawns are
+        promoted to queen unless promotion gives another piece class.
+        The move is emitted to self.events unless skip_print is set.
 
         Returns: None or dictionary of chesspiece info
         """
-        current_info = self.state[origin[0]][origin[1]].get_info()
         updated_piece = self.state[origin[0]][origin[1]]
-        removed_piece = self.state[target[0]][target[1]]
+        record = self.make_move(origin, target, promotion)
 
-        if removed_piece is not None:
-            removed_info = removed_piece.get_info()
+        if record.captured is not None:
+            removed_info = record.captured.get_info()
         else:
             removed_info = None
 
-        self.state[origin[0]][origin[1]] = None
-        self.state[target[0]][target[1]] = updated_piece
-        self.state[target[0]][target[1]].set_position(target)
-
-        if self.state[target[0]][target[1]].get_info()['type'] == "king":
-            if self.state[target[0]][target[1]].get_info()['color'] == "W":
-                self.w_king = self.state[target[0]][target[1]].get_position()
-            else:
-                self.b_king = self.state[target[0]][target[1]].get_position()
-
-        # check for castlings
-        if self.state[target[0]][target[1]].get_info()['type'] == "king":
-            if self.state[target[0]][target[1]].get_info()['castle']:
-                # compare columns here for castling and make changes accordingly
-                if target[1] < 3:
-                    rook_to_update = self.state[target[0]][target[1]-2]
-                    self.state[target[0]][target[1]-2] = None
-                    self.state[target[0]][target[1]+1] = rook_to_update
-                else:
-                    rook_to_update = self.state[target[0]][target[1]+1]
-                    self.state[target[0]][target[1]+1] = None
-                    self.state[target[0]][target[1]-1] = rook_to_update
-                rook_to_update.set_moved()
-                self.state[target[0]][target[1]].set_castle_off()
-                rook_info = rook_to_update.get_info()
-                king = self.state[target[0]][target[1]]
-                king_info = king.get_info()
-                print(f"Castling with: {king_info['type']} at", end=" ")
-                print(f"{king.chess_format(king_info['position'])}", end=" ")
-                print(f"with {rook_info['type']} at", end=" ")
-                print(f"{king.chess_format(rook_info['position'])}.", end=" ")
-
-        # check for pawn en_passant or promotion rule
-        if self.state[target[0]][target[1]].get_info()['type'] == "pawn":
-            if self.state[target[0]][target[1]].get_info()['promotion']:
-                color = self.state[target[0]][target[1]].get_info()['color']
-                self.state[target[0]][target[1]] = pieces.Queen(
-                    (target[0], target[1]), color)
-                queen = self.state[target[0]][target[1]]
-                queen_info = queen.get_info()
-                print(f"Promoting {queen.color(queen_info['color']).lower()}", end=" ")
-                print(f" pawn to queen at", end=" ")
-                print(f"{queen.chess_format(queen_info['position'])}.", end=" ")
-            if self.state[target[0]][target[1]].get_info()['can_en_passant']:
-                pawn = self.state[target[0]][target[1]]
-                info = self.state[target[0]][target[1]].get_info()
-                # Eats the piece by en passant
-                if info['color'] == "W":
-                    rmvd_info = self.state[target[0]-1][target[1]].get_info()
-                    self.state[target[0]-1][target[1]] = None
-                else:
-                    removed_info = self.state[target[0] -
-                                              1][target[1]].get_info()
-                    self.state[target[0]+1][target[1]] = None
-                print(f"En passant with: {info['type']} at", end=" ")
-                print(f"{pawn.chess_format(info['position'])}", end=" ")
-                print(f"agaist {rmvd_info['type']} at", end=" ")
-                print(f"{pawn.chess_format(rmvd_info['position'])}.", end=" ")
-                self.state[target[0]][target[1]].set_off_en_passant()
-
-        info = updated_piece.get_info()
-        color = updated_piece.color(info['color']).lower()
-        print(f"Move: {color} {info['type']} at ", end="")
-        print(f"{updated_piece.chess_format(current_info['position'])} ", end="")
-        print(f"to {updated_piece.chess_format(info['position'])}")
+        if updated_piece.KIND == PAWN:
+            updated_piece.set_off_en_passant()
+            updated_piece.promotion = False
+        if record.rook_move is not None:
+            updated_piece.set_castle_off()
+
+        events = self.events
+        if skip_print or not events.active:
+            return removed_info
+
+        color = COLORS[updated_piece.side]
+        if record.rook_move is not None:
+            rook, rook_from, _ = record.rook_move
+            events.emit("castling", piece=updated_piece.TYPE, target=target,
+                        rook=rook.TYPE, rook_from=rook_from)
+        if record.promoted is not None:
+            events.emit("promotion", color=color, piece=record.promoted.TYPE,
+                        position=target)
+        if record.captured_at != target:
+            events.emit("en_passant", piece=updated_piece.TYPE, target=target,
+                        captured=record.captured.TYPE,
+                        captured_at=record.captured_at)
+        events.emit("move", color=color, piece=updated_piece.TYPE,
+                    origin=origin, target=target)
 
         return removed_info
 
-    def check_board_state(self):
+    def check_board_state(self, skip_print: bool = False):
         """For checking the game state. Sees if the king are checked by
         calling is_checked(), and if they are, then sees if there are
         any moves left to defend the king by calling is_checkmate().
         Also sees if the kings are in stalemate, i. e they cannot move
-        but are not under threat or other pieces cannot move.
+        but are not under threat or other pieces cannot move, and if
+        the game is drawn by repetition or the fifty-move rule.
 
         Returns:
             True or False based on boolean
         """
         game_over = False
+        w_king = self.state[self.w_king[0]][self.w_king[1]]
+        b_king = self.state[self.b_king[0]][self.b_king[1]]
 
-        if self.state[self.w_king[0]][self.w_king[1]].is_checked(self.state):
-            print("White king is checked!")
-            if self.state[self.w_king[0]][self.w_king[1]].is_checkmate(self.state):
-                print("Checkmate! Black player wins!")
+        if w_king.is_checked(self.state, None, False, skip_print):
+            self._emit(skip_print, "checked", color="W")
+            if w_king.is_checkmate(self.state):
+                self._emit(skip_print, "checkmate", winner="B")
                 game_over = True
 
-        if self.state[self.b_king[0]][self.b_king[1]].is_checked(self.state):
-            print("Black king is checked!")
-            if self.state[self.b_king[0]][self.b_king[1]].is_checkmate(self.state):
-                print("Checkmate! White player wins!")
+        if b_king.is_checked(self.state, None, False, skip_print):
+            self._emit(skip_print, "checked", color="B")
+            if b_king.is_checkmate(self.state):
+                self._emit(skip_print, "checkmate", winner="W")
                 game_over = True
 
-        if self.state[self.w_king[0]][self.w_king[1]].is_stalemate(self.state):
-            print("Statemate! White player cannot move!")
+        if w_king.is_stalemate(self.state, skip_print):
+            self._emit(skip_print, "stalemate", color="W")
             game_over = True
 
-        if self.state[self.b_king[0]][self.b_king[1]].is_stalemate(self.state):
-            print("Statemate! Black player cannot move!")
+        if b_king.is_stalemate(self.state, skip_print):
+            self._emit(skip_print, "stalemate", color="B")
             game_over = True
 
+        if not game_over:
+            reason = self.draw_reason()
+            if reason is not None:
+                self._emit(skip_print, reason)
+                game_over = True
+
         return game_over
 
+    def draw_reason(self) -> str:
+        """"repetition" when the position has been on the board three
+        times, "fifty_moves" after 50 moves of both players without a
+        capture or a pawn move, otherwise None
+        """
+        if self.position_counts.get(self.hash, 0) >= 3:
+            return "repetition"
+        if self.halfmove >= 100:
+            return "fifty_moves"
+        return None
+
+    def _emit(self, skip_print: bool, name: str, **fields):
+        if not skip_print:
+            self.events.emit(name, **fields)
+
     def print_board(self):
-        """Simple function to print the chessboard.
-        Iterates over the board.state 2d list which
-        contains the chesspieces
+        """Simple function to print the chessboard. The whole frame
+        is written at once by self.renderer, which can also be set
+        to only redraw the changes.
         """
-        white_tile = True
-        self.print_line("SIMPLE CHESS", " ", "-", 46)
-        self.print_line(f"Move: {self.move}", " ", ".", 46)
-        print()
-        print("  || a    b    c    d    e    f    g    h || ")
-        print("#"*2, end="")
-        print("||", end="")
-        print("#"*38, end="")
-        print("||", end="")
-        print("#"*2)
-        for j in range(self.y-1, -1, -1):
-            print(f"{j+1} |", end="")
-            for i in range(0, self.x):
-                piece = self.state[j][i]
-                if white_tile:
-                    tile_color = Back.CYAN + Style.DIM
-                else:
-                    tile_color = Back.MAGENTA + Style.DIM
-                if piece is None:
-                    print(tile_color + "| x |" + Style.RESET_ALL, end="")
-                else:
-                    color = self.state[j][i].get_info()['color']
-                    symbol = self.state[j][i].get_info()['symbol'][color]
-                    print(tile_color + f"| {symbol} |" +
-                          Style.RESET_ALL, end="")
-                white_tile = not white_tile
-            white_tile = not white_tile
-            print(f"| {j+1}")
-        print("#"*2, end="")
-        print("||", end="")
-        print("#"*38, end="")
-        print("||", end="")
-        print("#"*2)
-        print("  || a    b    c    d    e    f    g    h || ")
+        self.renderer.render(self)
 
     def print_game_status(self):
         pass
@@ -225,28 +749,12 @@ class ChessBoard():
          txt_lenght (lenght of the text)
 
         """
-        def see_if_rounded(txt_lenght):
-            return round(number=txt_lenght, ndigits=None) < txt_lenght or \
-                round(number=txt_lenght, ndigits=None) > txt_lenght
-
-        txt_lenght = txt_lenght
-        txt_lenght -= len(title)
-        odd = see_if_rounded(txt_lenght/2)
-        txt_lenght = txt_lenght // 2
-        base_str = ""
-        if len(title) > 0:
-            for _ in range(1, txt_lenght):
-                base_str += fill_char
-            title = sepator.join([base_str, title])
-            title = sepator.join([title, base_str])
-            title += fill_char if odd else ''
-        else:
-            title = f''.join(f'{fill_char}'*txt_lenght*2)
-        print(title)
+        print(format_line(title, sepator, fill_char, txt_lenght))
 
 
 if __name__ == "__main__":
     chessboard = ChessBoard(chesspiece.chesspieces_dummy)
+    chessboard.events.subscribe(print_event)
     chessboard.make_board()
     chessboard.print_board()
 
@@ -70,3 +70,6 @@ chesspieces_dummy = {"6_0": {"type": pieces.Pawn, "color": "B"},
                      # "1_6": {"type": pieces.Pawn, "color": "W"},
                      # "1_7": {"type": pieces.Pawn, "color": "W"},
                      }
+
+# the same starting layout as chesspieces
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
@@ -0,0 +1,86 @@
+"""Static evaluation of a ChessBoard position in centipawns: material,
+piece-square tables and mobility. The tables are written from white's
+side, a1 first, and are mirrored by row for black.
+"""
+from bitboard import iter_squares, WHITE, BLACK
+
+PIECE_VALUES = (100, 320, 330, 500, 900, 0)
+# centipawns for every tile a piece attacks that is not taken by its
+# own color
+MOBILITY_WEIGHT = 2
+
+PAWN_SQUARES = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    0, 0, 0, 0, 0, 0, 0, 0)
+KNIGHT_SQUARES = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50)
+BISHOP_SQUARES = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20)
+ROOK_SQUARES = (
+    0, 0, 0, 5, 5, 0, 0, 0,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0)
+QUEEN_SQUARES = (
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20)
+KING_SQUARES = (
+    20, 30, 10, 0, 0, 10, 30, 20,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30)
+# PIECE_SQUARES[type code]
+PIECE_SQUARES = (PAWN_SQUARES, KNIGHT_SQUARES, BISHOP_SQUARES,
+                 ROOK_SQUARES, QUEEN_SQUARES, KING_SQUARES)
+
+
+def evaluate(board) -> int:
+    """Score of the position for the side to move
+    """
+    bitboards = board.bitboards
+    score = 0
+    for side, sign, mirror in ((WHITE, 1, 0), (BLACK, -1, 56)):
+        side_score = 0
+        for kind, kind_pieces in enumerate(bitboards.pieces[side]):
+            value = PIECE_VALUES[kind]
+            squares = PIECE_SQUARES[kind]
+            for sq in iter_squares(kind_pieces):
+                side_score += value + squares[sq ^ mirror]
+        mobility = board.attacks[side] & ~bitboards.occupied[side]
+        side_score += MOBILITY_WEIGHT * mobility.bit_count()
+        score += sign * side_score
+    return score if board.turn == "W" else -score
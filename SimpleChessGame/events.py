@@ -0,0 +1,106 @@
+"""Events of a game. The board and the pieces report castling, en
+passant, promotions, moves, checks, illegal moves and the end of the
+game to the subscribers of an EventHub instead of printing them. With
+no subscribers nothing is built or written, which is how batch analysis
+and servers run. The interactive game subscribes print_event to get the
+messages printed.
+
+Every event has a name and a dictionary of fields. Pieces are named by
+their type, tiles are (row, column) tuples and colors are "W" or "B":
+
+    castling     piece, target, rook, rook_from
+    promotion    color, piece, position
+    en_passant   piece, target, captured, captured_at
+    move         color, piece, origin, target
+    check        piece, position (the checking piece)
+    illegal      reason ("king_capture" or "wrong_color")
+    checked      color
+    checkmate    winner
+    stalemate    color
+    repetition   (the third time the position is on the board)
+    fifty_moves  (50 moves of both players without a capture or a
+                 pawn move)
+"""
+from typing import Callable
+
+LETTERS = "abcdefgh"
+COLOR_NAMES = {"W": "White", "B": "Black"}
+
+
+class EventHub():
+    """Passes events to the subscribed callbacks, which are called with
+    the event name and its fields
+    """
+
+    def __init__(self):
+        self.subscribers: list = []
+
+    @property
+    def active(self) -> bool:
+        """Whether anyone listens. Checked before an event is built.
+        """
+        return bool(self.subscribers)
+
+    def subscribe(self, callback: Callable) -> Callable:
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable):
+        self.subscribers.remove(callback)
+
+    def emit(self, name: str, **fields):
+        for callback in self.subscribers:
+            callback(name, fields)
+
+
+# hub of the pieces on plain lists, which have no ChessBoard
+hub = EventHub()
+
+
+def tile(position: tuple) -> str:
+    return f"{LETTERS[position[1]]}{position[0] + 1}"
+
+
+def format_event(name: str, fields: dict) -> str:
+    """The message of an event as the game prints it. Castling, en
+    passant and promotion messages are followed by the move on the
+    same line.
+    """
+    if name == "castling":
+        return f"Castling with: {fields['piece']} at " \
+            f"{tile(fields['target'])} with {fields['rook']} at " \
+            f"{tile(fields['rook_from'])}. "
+    if name == "promotion":
+        return f"Promoting {COLOR_NAMES[fields['color']].lower()}  pawn " \
+            f"to {fields['piece']} at {tile(fields['position'])}. "
+    if name == "en_passant":
+        return f"En passant with: {fields['piece']} at " \
+            f"{tile(fields['target'])} agaist {fields['captured']} at " \
+            f"{tile(fields['captured_at'])}. "
+    if name == "move":
+        return f"Move: {COLOR_NAMES[fields['color']].lower()} " \
+            f"{fields['piece']} at {tile(fields['origin'])} " \
+            f"to {tile(fields['target'])}\n"
+    if name == "check":
+        return f"King is checked by {fields['piece']} at " \
+            f"{tile(fields['position'])}\n"
+    if name == "illegal":
+        if fields["reason"] == "king_capture":
+            return "A King can only check mated - not eaten\n"
+        return "Cannot move pieces not belonging own color\n"
+    if name == "checked":
+        return f"{COLOR_NAMES[fields['color']]} king is checked!\n"
+    if name == "checkmate":
+        return f"Checkmate! {COLOR_NAMES[fields['winner']]} player wins!\n"
+    if name == "stalemate":
+        return f"Statemate! {COLOR_NAMES[fields['color']]} player " \
+            "cannot move!\n"
+    if name == "repetition":
+        return "Draw! The same position for the third time!\n"
+    if name == "fifty_moves":
+        return "Draw! 50 moves without a capture or a pawn move!\n"
+    return ""
+
+
+def print_event(name: str, fields: dict):
+    print(format_event(name, fields), end="")
@@ -0,0 +1,69 @@
+"""Forsyth-Edwards Notation, the one line description of a position:
+
+    rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1
+
+placement from the 8th row to the 1st, side to move, castling rights,
+en passant tile, halfmove clock and fullmove number.
+"""
+from functools import lru_cache
+import pieces
+
+FEN_PIECES = {"p": pieces.Pawn, "n": pieces.Knight, "b": pieces.Bishop,
+              "r": pieces.Rook, "q": pieces.Queen, "k": pieces.King}
+FEN_LETTERS = {p_type: letter for letter, p_type in FEN_PIECES.items()}
+# castling letters in FEN order with the ChessBoard castling right bits
+CASTLING_LETTERS = (("K", 1), ("Q", 2), ("k", 4), ("q", 8))
+LETTERS = "abcdefgh"
+
+
+@lru_cache(maxsize=1024)
+def parse_fen(fen: str) -> tuple:
+    """Parses a FEN string into (placement, turn, castling, en_passant,
+    halfmove, fullmove). placement is a tuple of ((row, col), piece
+    class, color), castling the right bits and en_passant a (row, col)
+    tile or None. The results are memoized, so they are immutable.
+    The move counters may be left out and default to 0 and 1.
+    """
+    fields = fen.split()
+    if len(fields) not in (4, 6):
+        raise ValueError(f"Invalid FEN: {fen}")
+    placement_field, turn, castling_field, en_passant_field = fields[:4]
+
+    ranks = placement_field.split("/")
+    if len(ranks) != 8:
+        raise ValueError(f"Invalid FEN placement: {placement_field}")
+    placement = []
+    for index, rank in enumerate(ranks):
+        row = 7 - index
+        col = 0
+        for char in rank:
+            if char.isdigit():
+                col += int(char)
+            elif char.lower() in FEN_PIECES:
+                color = "W" if char.isupper() else "B"
+                placement.append(((row, col), FEN_PIECES[char.lower()],
+                                  color))
+                col += 1
+            else:
+                raise ValueError(f"Invalid FEN piece: {char}")
+        if col != 8:
+            raise ValueError(f"Invalid FEN rank: {rank}")
+
+    if turn not in ("w", "b"):
+        raise ValueError(f"Invalid FEN side to move: {turn}")
+    castling = 0
+    for letter, right in CASTLING_LETTERS:
+        if letter in castling_field:
+            castling |= right
+    en_passant = None
+    if en_passant_field != "-":
+        if len(en_passant_field) != 2 or en_passant_field[0] not in LETTERS \
+                or en_passant_field[1] not in "36":
+            raise ValueError(f"Invalid FEN en passant: {en_passant_field}")
+        en_passant = (int(en_passant_field[1]) - 1,
+                      LETTERS.index(en_passant_field[0]))
+    halfmove, fullmove = (int(fields[4]), int(fields[5])) \
+        if len(fields) == 6 else (0, 1)
+
+    return (tuple(placement), turn.upper(), castling, en_passant,
+            halfmove, fullmove)
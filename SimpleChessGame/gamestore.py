@@ -0,0 +1,143 @@
+"""On-disk store of played games. Every move takes 16 bits:
+
+    bits 0-5   from square (row * 8 + col)
+    bits 6-11  to square
+    bits 12-14 promotion piece, 0 when the move is not a promotion
+
+The data file holds the games one after another, each a small header
+followed by its moves. The index file holds the 8 byte offset of every
+game in the data file and is read through mmap, so a game is found by
+its number without reading the games before it.
+"""
+import mmap
+import os
+import struct
+import time
+import pieces
+from bitboard import WHITE
+
+# promotion piece by code, code 0 meaning no promotion
+PROMOTION_PIECES = (None, pieces.Queen, pieces.Rook, pieces.Bishop,
+                    pieces.Knight)
+PROMOTION_CODES = {piece: code for code, piece in enumerate(PROMOTION_PIECES)}
+
+UNFINISHED, WHITE_WINS, BLACK_WINS, DRAW = range(4)
+RESULTS = ("Unfinished", "White wins", "Black wins", "Draw")
+
+# per game: time played, number of moves and result
+HEADER = struct.Struct("<IHB")
+OFFSET = struct.Struct("<Q")
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "games")
+
+
+def encode_move(origin: tuple, target: tuple, promotion: type = None) -> int:
+    return (origin[0] * 8 + origin[1] |
+            (target[0] * 8 + target[1]) << 6 |
+            PROMOTION_CODES[promotion] << 12)
+
+
+def decode_move(code: int) -> tuple:
+    """Returns (origin, target, promotion) with the tiles as (row, col)
+    and promotion None or the piece class
+    """
+    origin = code & 63
+    target = code >> 6 & 63
+    return ((origin >> 3, origin & 7), (target >> 3, target & 7),
+            PROMOTION_PIECES[code >> 12 & 7])
+
+
+def moves_of(board) -> list:
+    """Moves made on a ChessBoard as (origin, target, promotion)
+    """
+    return [(record.origin, record.target,
+             type(record.promoted) if record.promoted else None)
+            for record in board.history]
+
+
+def result_of(board) -> int:
+    """Result of a finished game on a ChessBoard: the side to move
+    has lost if it is mated, otherwise the game is a draw
+    """
+    king_at = board.w_king if board.turn == "W" else board.b_king
+    king = board.state[king_at[0]][king_at[1]]
+    if not king.is_checked(board.state, None, True, True) or \
+            board.any_legal_move():
+        return DRAW
+    return BLACK_WINS if king.side == WHITE else WHITE_WINS
+
+
+class GameStore():
+    """Appends games to path.bin with their offsets in path.idx.
+    The files are created with the first game.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.data_path = path + ".bin"
+        self.index_path = path + ".idx"
+        self._index = None
+        self._data = None
+        self._files = []
+
+    def append(self, moves: list, result: int = UNFINISHED) -> int:
+        """Stores a game given as (origin, target, promotion) moves.
+        Returns the number of the game, counting from 0.
+        """
+        self.close()
+        codes = [encode_move(*move) for move in moves]
+        with open(self.data_path, "ab") as data_file:
+            offset = data_file.tell()
+            data_file.write(HEADER.pack(int(time.time()), len(codes), result))
+            data_file.write(struct.pack(f"<{len(codes)}H", *codes))
+        with open(self.index_path, "ab") as index_file:
+            number = index_file.tell() // OFFSET.size
+            index_file.write(OFFSET.pack(offset))
+        return number
+
+    def __len__(self) -> int:
+        if not os.path.exists(self.index_path):
+            return 0
+        return os.path.getsize(self.index_path) // OFFSET.size
+
+    def _open(self):
+        for path in (self.index_path, self.data_path):
+            file = open(path, "rb")
+            self._files.append(file)
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            if path == self.index_path:
+                self._index = mapped
+            else:
+                self._data = mapped
+
+    def header(self, number: int) -> dict:
+        """Time played, number of moves and result of a game
+        """
+        offset = self._offset(number)
+        played, length, result = HEADER.unpack_from(self._data, offset)
+        return {"played": played, "moves": length, "result": result}
+
+    def game(self, number: int) -> list:
+        """Moves of a game as (origin, target, promotion) tuples
+        """
+        offset = self._offset(number)
+        length = HEADER.unpack_from(self._data, offset)[1]
+        codes = struct.unpack_from(f"<{length}H", self._data,
+                                   offset + HEADER.size)
+        return [decode_move(code) for code in codes]
+
+    def _offset(self, number: int) -> int:
+        if not 0 <= number < len(self):
+            raise IndexError(f"No game number {number}")
+        if self._index is None or len(self._index) <= number * OFFSET.size:
+            self.close()
+            self._open()
+        return OFFSET.unpack_from(self._index, number * OFFSET.size)[0]
+
+    def close(self):
+        for mapped in (self._index, self._data):
+            if mapped is not None:
+                mapped.close()
+        for file in self._files:
+            file.close()
+        self._index = self._data = None
+        self._files = []
@@ -0,0 +1,232 @@
+"""Optional profiling of games. An enabled Profiler wraps these functions
+to count their calls and time them:
+
+    _get_moves of every piece type, King.temporary_board (also the
+    bytes of the board copies), King.is_checked, King.is_checkmate,
+    King.is_stalemate, ChessBoard.generate_legal_moves,
+    ChessBoard.any_legal_move and ChessBoard.update_board
+
+The legal move generation of a ChessBoard goes through the _iter_moves
+generators of the pieces, so its time shows under generate_legal_moves
+and any_legal_move rather than _get_moves.
+
+Disabling it puts the original functions back, so a disabled profiler
+costs nothing. The times include the calls a function makes, and the
+time of a turn is the time of its outermost calls: code outside the
+wrapped functions, like reading the input or parsing a SAN move apart
+from the legal moves it asks for, is not counted.
+
+A turn starts with update_board() and holds the move and everything
+done until the next one, like checking the position the move led to.
+Calls made before the first move of a game are kept apart as its
+setup. end_game() closes the game, and the collected games can be
+written as JSON or printed as a summary.
+
+    python instrumentation.py games.pgn --json profile.json
+"""
+import argparse
+import functools
+import json
+import sys
+import time
+import pieces
+import pgn
+from chessboard import ChessBoard
+from validator import validate_game
+
+PIECE_TYPES = (pieces.Pawn, pieces.Knight, pieces.Bishop, pieces.Rook,
+               pieces.Queen, pieces.King)
+# (owner, attribute, name in the statistics)
+TIMED = tuple((p_type, "_get_moves", f"_get_moves {p_type.TYPE}")
+              for p_type in PIECE_TYPES) + (
+    (pieces.King, "temporary_board", "temporary_board"),
+    (pieces.King, "is_checked", "is_checked"),
+    (pieces.King, "is_checkmate", "is_checkmate"),
+    (pieces.King, "is_stalemate", "is_stalemate"),
+    (ChessBoard, "generate_legal_moves", "generate_legal_moves"),
+    (ChessBoard, "any_legal_move", "any_legal_move"),
+    (ChessBoard, "update_board", "update_board"))
+
+
+def board_bytes(board_state: list) -> int:
+    """Memory of a board copy: the lists and the pieces in them
+    """
+    size = sys.getsizeof(board_state)
+    for row in board_state:
+        size += sys.getsizeof(row)
+        size += sum(sys.getsizeof(piece) for piece in row if piece is not None)
+    return size
+
+
+class Profiler():
+    """Collects call counts and times per turn and per game while it is
+    enabled. Can be used as a context manager.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.games = []
+        self.turns = []
+        self.turn = self._new_turn(0, None)
+        self.depth = 0
+        self.patched = []
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *_):
+        self.disable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        for owner, attribute, name in TIMED:
+            self._patch(owner, attribute, name)
+        self.enabled = True
+
+    def disable(self):
+        for owner, attribute, original in reversed(self.patched):
+            if original is None:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
+        self.patched = []
+        self.enabled = False
+
+    def end_game(self):
+        """Closes the running game and starts a new one
+        """
+        self._end_turn()
+        if self.turns:
+            # turn 0 holds the calls made before the first move
+            setup = self.turns[0] if not self.turns[0]["turn"] else None
+            self.games.append({"game": len(self.games) + 1,
+                               "setup": setup,
+                               "turns": self.turns[1 if setup else 0:],
+                               "totals": self.totals(self.turns)})
+        self.turns = []
+        self.turn = self._new_turn(0, None)
+
+    @staticmethod
+    def totals(turns: list) -> dict:
+        """Function statistics of turns added together
+        """
+        functions = {}
+        for turn in turns:
+            for name, stats in turn["functions"].items():
+                total = functions.setdefault(name, dict.fromkeys(stats, 0))
+                for key, value in stats.items():
+                    total[key] += value
+        return {"seconds": sum(turn["seconds"] for turn in turns),
+                "functions": functions}
+
+    def to_json(self, path: str = None) -> str:
+        text = json.dumps({"games": self.games}, indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as json_file:
+                json_file.write(text)
+        return text
+
+    def summary(self, slowest: int = 5) -> str:
+        """Totals of the last game and its slowest turns
+        """
+        if not self.games:
+            return "No games profiled"
+        game = self.games[-1]
+        totals = game["totals"]
+        lines = [f"Game {game['game']}: {len(game['turns'])} turns, "
+                 f"{totals['seconds']:.3f} s in the timed functions"]
+        if game["setup"] is not None:
+            lines.append(f"  setup before the first move "
+                         f"{game['setup']['seconds']:.3f} s")
+        ordered = sorted(totals["functions"].items(),
+                         key=lambda item: -item[1]["seconds"])
+        for name, stats in ordered:
+            line = f"  {name:<20} {stats['calls']:>9} calls " \
+                f"{stats['seconds']:>9.3f} s"
+            if "bytes" in stats:
+                line += f" {stats['bytes']:>12} bytes copied"
+            lines.append(line)
+        lines.append("Slowest turns:")
+        for turn in sorted(game["turns"], key=lambda turn: -turn["seconds"])[
+                :slowest]:
+            busiest = max(turn["functions"].items(),
+                          key=lambda item: item[1]["seconds"])[0]
+            lines.append(f"  turn {turn['turn']:>3} {turn['move'] or '-':<5}"
+                         f" {turn['seconds']:.3f} s, most in {busiest}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _new_turn(number: int, move: str) -> dict:
+        return {"turn": number, "move": move, "seconds": 0.0,
+                "functions": {}}
+
+    def _end_turn(self):
+        if self.turn["functions"]:
+            self.turns.append(self.turn)
+
+    def _start_turn(self, origin: tuple, target: tuple):
+        self._end_turn()
+        move = pieces.Piece.chess_format(origin) + \
+            pieces.Piece.chess_format(target)
+        self.turn = self._new_turn(self.turn["turn"] + 1, move)
+
+    def _record(self, name: str, seconds: float, copied: int = None):
+        stats = self.turn["functions"].get(name)
+        if stats is None:
+            stats = {"calls": 0, "seconds": 0.0}
+            if copied is not None:
+                stats["bytes"] = 0
+            self.turn["functions"][name] = stats
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        if copied is not None:
+            stats["bytes"] += copied
+        if self.depth == 0:
+            self.turn["seconds"] += seconds
+
+    def _patch(self, owner: type, attribute: str, name: str):
+        function = getattr(owner, attribute)
+        profiler = self
+        starts_turn = attribute == "update_board"
+        copies = attribute == "temporary_board"
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            if starts_turn and profiler.depth == 0:
+                profiler._start_turn(args[1], args[2])
+            start = time.perf_counter()
+            profiler.depth += 1
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                profiler.depth -= 1
+            seconds = time.perf_counter() - start
+            copied = board_bytes(result[0]) if copies else None
+            profiler._record(name, seconds, copied)
+            return result
+
+        self.patched.append((owner, attribute, owner.__dict__.get(attribute)))
+        setattr(owner, attribute, timed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile the move checking "
+                                                 "of the games in a PGN file")
+    parser.add_argument("path")
+    parser.add_argument("--json", default=None,
+                        help="file for the statistics of every game")
+    args = parser.parse_args()
+
+    profiler = Profiler()
+    with open(args.path, encoding="utf-8", errors="replace") as pgn_file:
+        with profiler:
+            for game in pgn.read_games(pgn_file):
+                if "FEN" in game["tags"]:
+                    continue
+                validate_game(game["moves"])
+                profiler.end_game()
+                print(profiler.summary())
+    if args.json is not None:
+        profiler.to_json(args.json)
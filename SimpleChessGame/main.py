@@ -1,9 +1,22 @@
+import argparse
+from instrumentation import Profiler
 from user_interface import UserInterface
 
-def play():
+def play(profiler: Profiler = None):
     
-    interface = UserInterface()
+    interface = UserInterface(profiler)
     interface.program_flow()
 
 if __name__ == "__main__":
-    play()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Simple Chess")
+    parser.add_argument("--profile", action="store_true",
+                        help="print where the time went after every game")
+    parser.add_argument("--profile-json", default=None,
+                        help="file for the profile of every game")
+    args = parser.parse_args()
+    profiler = None
+    if args.profile or args.profile_json:
+        profiler = Profiler()
+    play(profiler)
+    if args.profile_json:
+        profiler.to_json(args.profile_json)
@@ -0,0 +1,103 @@
+"""Move and ray lookup tables shared by all pieces. Built once when the
+module is imported. Every table is indexed by square, row * 8 + col,
+and holds only tiles that are on the board, so the move generation
+never has to check the bounds.
+"""
+
+ROOK_DIRECTIONS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+BISHOP_DIRECTIONS = ((-1, 1), (1, 1), (-1, -1), (1, -1))
+QUEEN_DIRECTIONS = BISHOP_DIRECTIONS + ROOK_DIRECTIONS
+KNIGHT_MOVEMENTS = ((-2, -1), (-1, -2), (1, -2), (2, -1),
+                    (-2, 1), (-1, 2), (1, 2), (2, 1))
+KING_MOVEMENTS = QUEEN_DIRECTIONS
+
+# pawn tables are indexed by color code, white 0 and black 1
+PAWN_DIRECTION = (1, -1)
+PAWN_START_ROW = (1, 6)
+PROMOTION_ROW = (7, 0)
+PROMOTION_TILES = tuple(tuple((row, col) for col in range(8))
+                        for row in PROMOTION_ROW)
+
+
+def _on_board(row: int, col: int) -> bool:
+    return 0 <= row < 8 and 0 <= col < 8
+
+
+def _step_targets(movements: tuple) -> list:
+    return [tuple((row + row2, col + col2) for row2, col2 in movements
+                  if _on_board(row + row2, col + col2))
+            for row in range(8) for col in range(8)]
+
+
+def _rays(direction: tuple) -> list:
+    rays = []
+    for row in range(8):
+        for col in range(8):
+            ray = []
+            trgt_row, trgt_col = row + direction[0], col + direction[1]
+            while _on_board(trgt_row, trgt_col):
+                ray.append((trgt_row, trgt_col))
+                trgt_row += direction[0]
+                trgt_col += direction[1]
+            rays.append(tuple(ray))
+    return rays
+
+
+def _pawn_pushes(color: int) -> list:
+    pushes = []
+    for row in range(8):
+        for col in range(8):
+            one_step = row + PAWN_DIRECTION[color]
+            if row == PROMOTION_ROW[color] or not _on_board(one_step, col):
+                pushes.append(())
+            elif row == PAWN_START_ROW[color]:
+                pushes.append(((one_step, col),
+                               (one_step + PAWN_DIRECTION[color], col)))
+            else:
+                pushes.append(((one_step, col),))
+    return pushes
+
+
+def _mask(tiles: tuple) -> int:
+    mask = 0
+    for row, col in tiles:
+        mask |= 1 << (row * 8 + col)
+    return mask
+
+
+def _squares(tiles: tuple) -> tuple:
+    return tuple(row * 8 + col for row, col in tiles)
+
+
+KNIGHT_TARGETS = _step_targets(KNIGHT_MOVEMENTS)
+KING_TARGETS = _step_targets(KING_MOVEMENTS)
+RAYS = {direction: _rays(direction) for direction in QUEEN_DIRECTIONS}
+PAWN_PUSHES = tuple(_pawn_pushes(color) for color in (0, 1))
+PAWN_CAPTURES = tuple(_step_targets(((step, -1), (step, 1)))
+                      for step in PAWN_DIRECTION)
+# tiles next to a pawn where an opposing pawn could be taken en passant
+PAWN_SIDES = _step_targets(((0, 1), (0, -1)))
+
+KNIGHT_ATTACKS = [_mask(tiles) for tiles in KNIGHT_TARGETS]
+KING_ATTACKS = [_mask(tiles) for tiles in KING_TARGETS]
+PAWN_ATTACKS = tuple([_mask(tiles) for tiles in captures]
+                     for captures in PAWN_CAPTURES)
+RAY_SQUARES = {direction: [_squares(ray) for ray in rays]
+               for direction, rays in RAYS.items()}
+
+
+def _between() -> list:
+    """BETWEEN[sq][trgt_sq]: mask of the tiles strictly between two
+    squares on the same line, 0 when they do not share a line
+    """
+    between = [[0] * 64 for _ in range(64)]
+    for rays in RAY_SQUARES.values():
+        for sq, ray in enumerate(rays):
+            mask = 0
+            for trgt_sq in ray:
+                between[sq][trgt_sq] = mask
+                mask |= 1 << trgt_sq
+    return between
+
+
+BETWEEN = _between()
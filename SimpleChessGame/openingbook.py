@@ -0,0 +1,186 @@
+"""Opening book: moves played from the early positions of earlier games,
+found by the Zobrist hash of the position. The book file is a sorted
+array of fixed records
+
+    8 bytes  position hash (ChessBoard.hash)
+    2 bytes  move, encoded like gamestore.encode_move()
+    2 bytes  weight, the number of games the move was played in
+
+sorted by hash and, for the same hash, by weight from high to low. The
+file is read through mmap and a position is found by binary search, so
+a lookup reads a few records and needs no move generation.
+
+    python openingbook.py games.pgn more.pgn --plies 30
+    python openingbook.py --store
+    python openingbook.py --probe "<FEN>"
+"""
+import argparse
+import mmap
+import os
+import struct
+from collections import Counter
+import chesspiece
+import gamestore
+import pgn
+from chessboard import ChessBoard
+
+RECORD = struct.Struct("<QHH")
+KEY = struct.Struct("<Q")
+MAX_WEIGHT = 0xFFFF
+# the first moves of a game that go into the book, by both colors
+DEFAULT_PLIES = 30
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "book.bin")
+
+
+def count_moves(games, plies: int = DEFAULT_PLIES,
+                counts: Counter = None) -> Counter:
+    """Counts the (hash, move code) pairs of the first plies of games
+    given as (origin, target, promotion) moves from the start position
+    """
+    counts = Counter() if counts is None else counts
+    for moves in games:
+        board = ChessBoard(chesspiece.START_FEN)
+        board.make_board()
+        for move in moves[:plies]:
+            counts[board.hash, gamestore.encode_move(*move)] += 1
+            board.make_move(*move)
+    return counts
+
+
+def pgn_moves(path: str, plies: int = DEFAULT_PLIES):
+    """Yields the first plies of the games of a PGN file that start
+    from the start position, as (origin, target, promotion) moves.
+    A game stops at its first move that cannot be read.
+    """
+    with open(path, encoding="utf-8", errors="replace") as pgn_file:
+        for game in pgn.read_games(pgn_file):
+            if "FEN" in game["tags"]:
+                continue
+            board = ChessBoard(chesspiece.START_FEN)
+            board.make_board()
+            moves = []
+            for san in game["moves"][:plies]:
+                try:
+                    move = pgn.san_to_move(board, san)
+                except ValueError as _:
+                    break
+                board.make_move(*move)
+                moves.append(move)
+            yield moves
+
+
+def write_book(counts: Counter, path: str = DEFAULT_PATH,
+               min_weight: int = 1) -> int:
+    """Writes the counted moves as a book file. Returns the number of
+    records.
+    """
+    records = sorted(((key, move, min(weight, MAX_WEIGHT))
+                      for (key, move), weight in counts.items()
+                      if weight >= min_weight),
+                     key=lambda record: (record[0], -record[2]))
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as book_file:
+        book_file.write(b"".join(RECORD.pack(*record) for record in records))
+    os.replace(temp_path, path)
+    return len(records)
+
+
+class OpeningBook():
+    """Looks up the book moves of ChessBoard positions. A missing book
+    file is an empty book.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._file = None
+        self._data = None
+        self.count = 0
+        if os.path.exists(path) and os.path.getsize(path):
+            self._file = open(path, "rb")
+            self._data = mmap.mmap(self._file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+            self.count = len(self._data) // RECORD.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def lookup(self, key: int) -> list:
+        """(move code, weight) of every book move of a position hash,
+        most played first
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(self._data, middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        for index in range(low, self.count):
+            record_key, move, weight = RECORD.unpack_from(
+                self._data, index * RECORD.size)
+            if record_key != key:
+                break
+            found.append((move, weight))
+        return found
+
+    def moves(self, board: ChessBoard) -> list:
+        """Book moves of the position of a board as ((origin, target,
+        promotion), weight), most played first
+        """
+        return [(gamestore.decode_move(move), weight)
+                for move, weight in self.lookup(board.hash)]
+
+    def best_move(self, board: ChessBoard) -> tuple:
+        """The most played book move of the position, or None
+        """
+        if not self.count:
+            return None
+        found = self.lookup(board.hash)
+        return gamestore.decode_move(found[0][0]) if found else None
+
+    def close(self):
+        if self._data is not None:
+            self._data.close()
+            self._file.close()
+        self._data = self._file = None
+        self.count = 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or probe the "
+                                                 "opening book")
+    parser.add_argument("paths", nargs="*", help="PGN files to build from")
+    parser.add_argument("--store", action="store_true",
+                        help="build from the game store too")
+    parser.add_argument("--plies", type=int, default=DEFAULT_PLIES)
+    parser.add_argument("--min-weight", type=int, default=1,
+                        help="leave out moves played fewer times")
+    parser.add_argument("--output", default=DEFAULT_PATH)
+    parser.add_argument("--probe", metavar="FEN", default=None,
+                        help="print the book moves of a position")
+    args = parser.parse_args()
+
+    if args.probe is not None:
+        board = ChessBoard(args.probe)
+        board.make_board()
+        book = OpeningBook(args.output)
+        for (origin, target, promotion), weight in book.moves(board):
+            piece = board.state[origin[0]][origin[1]]
+            print(f"{piece.TYPE} {piece.chess_format(origin)}", end=" ")
+            print(f"to {piece.chess_format(target)}: {weight}")
+    else:
+        counts = Counter()
+        for path in args.paths:
+            count_moves(pgn_moves(path, args.plies), args.plies, counts)
+        if args.store:
+            store = gamestore.GameStore()
+            count_moves((store.game(number) for number in range(len(store))),
+                        args.plies, counts)
+            store.close()
+        records = write_book(counts, args.output, args.min_weight)
+        print(f"{records} book moves from {sum(counts.values())} positions",
+              end=" ")
+        print(f"written to {args.output}")
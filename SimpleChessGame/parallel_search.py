@@ -0,0 +1,108 @@
+"""Parallel search that splits the root moves over a process pool.
+Every worker sets up its own ChessBoard from the FEN of the position
+and the position counts of the game, which the FEN leaves out but the
+repetition draws need, and searches one root move at a time, so the
+pool balances itself when some moves take longer than others.
+
+The root moves are taken in the order the serial search would use at
+that depth. The first one is searched alone for its exact score, then
+the others in parallel against that score: a move scoring higher gets
+its exact score, the rest only show that they are not better. The
+first move with the highest score wins, which gives the same best move
+and score as Search at equal depth.
+
+    python parallel_search.py --depth 4 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import chesspiece
+from chessboard import ChessBoard
+from search import Search, INFINITY, move_name
+from transposition import TranspositionTable
+
+
+def search_move(fen: str, move: tuple, depth: int,
+                alpha: int = -INFINITY, position_counts: dict = None) -> tuple:
+    """Score of a root move searched to depth, with its line and the
+    node count. The score is exact when it is above alpha, otherwise
+    it is alpha. position_counts are the ChessBoard.position_counts of
+    the game the position comes from.
+    """
+    board = ChessBoard(fen, TranspositionTable(8))
+    board.make_board()
+    if position_counts is not None:
+        board.position_counts = dict(position_counts)
+    search = Search(board)
+    board.make_move(*move)
+    score, pv = search.negamax(depth - 1, -INFINITY, -alpha, 1)
+    board.unmake_move()
+    return -score, [move] + pv, search.nodes
+
+
+def root_order(board: ChessBoard, depth: int) -> list:
+    """Root moves in the order the serial search tries them at depth,
+    which depends on the best moves of the depths before it
+    """
+    if depth == 1:
+        return board.legal_moves()
+    search = Search(board, max_depth=depth - 1)
+    search.search()
+    return search.root_moves
+
+
+def parallel_search(board: ChessBoard, depth: int,
+                    executor: ProcessPoolExecutor) -> dict:
+    """Searches the position of the board to depth with the workers of
+    the executor. Returns the same fields as Search.search().
+    """
+    start = time.perf_counter()
+    moves = root_order(board, depth)
+    if not moves:
+        return {"move": None, "score": 0, "depth": 0, "pv": [], "nodes": 0,
+                "seconds": 0.0, "nps": 0}
+    fen = board.to_fen()
+    counts = board.position_counts
+    best_score, best_pv, nodes = executor.submit(
+        search_move, fen, moves[0], depth, -INFINITY, counts).result()
+    others = moves[1:]
+    results = executor.map(search_move, [fen] * len(others), others,
+                           [depth] * len(others),
+                           [best_score] * len(others),
+                           [counts] * len(others))
+    for score, pv, move_nodes in results:
+        nodes += move_nodes
+        if score > best_score:
+            best_score, best_pv = score, pv
+    elapsed = time.perf_counter() - start
+    return {"move": best_pv[0], "score": best_score, "depth": depth,
+            "pv": best_pv, "nodes": nodes, "seconds": elapsed,
+            "nps": nodes / elapsed if elapsed > 0 else 0}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the serial and "
+                                                 "the parallel search")
+    parser.add_argument("fen", nargs="?", default=chesspiece.START_FEN)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[1, 2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    board = ChessBoard(args.fen)
+    board.make_board()
+    serial = Search(board, max_depth=args.depth).search()
+    print(f"serial: {move_name(serial['move'])} score {serial['score']}",
+          end=" ")
+    print(f"in {serial['seconds']:.2f} s")
+
+    for workers in sorted(set(args.workers)):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            result = parallel_search(board, args.depth, executor)
+        same = (result["move"], result["score"]) == \
+            (serial["move"], serial["score"])
+        print(f"{workers} workers: {move_name(result['move'])}", end=" ")
+        print(f"score {result['score']} in {result['seconds']:.2f} s,", end=" ")
+        print(f"speedup {serial['seconds'] / result['seconds']:.2f}x,", end=" ")
+        print("same as serial" if same else "DIFFERENT from serial")
@@ -0,0 +1,135 @@
+"""Perft counts the leaf nodes of the move tree to a given depth. The
+counts of the positions below are well known, so a wrong number means
+a bug in the move generation, usually in castling, en passant or
+promotion. The time taken gives the nodes per second of the generator.
+
+With --update-board the moves are played through
+ChessBoard.update_board(), the way the game and the server move pieces,
+instead of make_move(), so its castling, en passant and promotion
+handling is covered as well.
+
+    python perft.py --depth 3
+    python perft.py --depth 3 --update-board
+    python perft.py kiwipete --depth 2 --divide
+"""
+import argparse
+import time
+import chesspiece
+from chessboard import ChessBoard
+from fen import FEN_LETTERS
+from transposition import TranspositionTable
+
+# name: (FEN or None for chesspiece.chesspieces, known counts by depth)
+POSITIONS = {
+    "start": (None, {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R "
+                 "w KQkq - 0 1", {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    "endgame": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+                {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    "promotions": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 "
+                   "w kq - 0 1", {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    "middlegame": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R "
+                   "w KQ - 1 8", {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+}
+
+
+def make_position(name: str) -> ChessBoard:
+    # own table, so perft does not fill the cache of the game boards
+    fen = POSITIONS[name][0]
+    board = ChessBoard(chesspiece.chesspieces if fen is None else fen,
+                       TranspositionTable())
+    board.make_board()
+    return board
+
+
+def play(board: ChessBoard, move: tuple, update_board: bool = False):
+    origin, target, promotion = move
+    if update_board:
+        board.update_board(origin, target, promotion, True)
+    else:
+        board.make_move(origin, target, promotion)
+
+
+def perft(board: ChessBoard, depth: int, update_board: bool = False) -> int:
+    """Number of leaf nodes depth plies below the current position. The
+    moves are made with update_board() when it is set, otherwise with
+    make_move().
+    """
+    if depth == 0:
+        return 1
+    moves = board.generate_legal_moves(board.turn)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        play(board, move, update_board)
+        nodes += perft(board, depth - 1, update_board)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board: ChessBoard, depth: int,
+           update_board: bool = False) -> dict:
+    """perft() split by root move, with moves in chess format like
+    "e2e4" or "a7a8q"
+    """
+    counts = {}
+    for origin, target, promotion in board.generate_legal_moves(board.turn):
+        piece = board.state[origin[0]][origin[1]]
+        name = piece.chess_format(origin) + piece.chess_format(target)
+        if promotion is not None:
+            name += FEN_LETTERS[promotion]
+        play(board, (origin, target, promotion), update_board)
+        counts[name.lower()] = perft(board, depth - 1, update_board)
+        board.unmake_move()
+    return counts
+
+
+def run(name: str, depth: int, show_divide: bool = False,
+        update_board: bool = False) -> bool:
+    """Runs perft for one position and prints the count, time and
+    nodes per second. Returns False if the count is wrong.
+    """
+    board = make_position(name)
+    start = time.perf_counter()
+    if show_divide:
+        counts = divide(board, depth, update_board)
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(board, depth, update_board)
+    elapsed = time.perf_counter() - start
+
+    if show_divide:
+        for move, count in sorted(counts.items()):
+            print(f"{move}: {count}")
+    expected = POSITIONS[name][1].get(depth)
+    nps = nodes / elapsed if elapsed > 0 else 0
+    if expected is None:
+        verdict = "no known count"
+    elif nodes == expected:
+        verdict = "ok"
+    else:
+        verdict = f"WRONG, expected {expected}"
+    print(f"{name} depth {depth}: {nodes} nodes in {elapsed:.2f} s, "
+          f"{nps:.0f} nodes/s, {verdict}")
+    return expected is None or nodes == expected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move generator perft")
+    parser.add_argument("positions", nargs="*",
+                        help="positions to run, all by default: "
+                        + ", ".join(POSITIONS))
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--divide", action="store_true",
+                        help="show the node count of each root move")
+    parser.add_argument("--update-board", action="store_true",
+                        help="make the moves with ChessBoard.update_board()")
+    args = parser.parse_args()
+    for name in args.positions:
+        if name not in POSITIONS:
+            parser.error(f"unknown position: {name}")
+
+    results = [run(name, args.depth, args.divide, args.update_board)
+               for name in args.positions or POSITIONS]
+    raise SystemExit(0 if all(results) else 1)
@@ -0,0 +1,168 @@
+"""Streaming PGN reader. Games are read one at a time from the file and
+replayed through ChessBoard.update_board(), so memory use does not grow
+with the size of the file.
+
+    python pgn.py games.pgn
+    python pgn.py games.pgn --store
+"""
+import argparse
+import re
+import time
+from typing import Iterator
+import chesspiece
+import gamestore
+import pieces
+from chessboard import ChessBoard
+
+TAG = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+SAN = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$")
+# comments, variations, NAGs and move numbers are not moves
+NOT_MOVES = re.compile(r"\{[^}]*\}|;[^\n]*|\$\d+|\d+\.+")
+RESULTS = {"1-0": gamestore.WHITE_WINS, "0-1": gamestore.BLACK_WINS,
+           "1/2-1/2": gamestore.DRAW, "*": gamestore.UNFINISHED}
+
+SAN_PIECES = {"N": pieces.Knight, "B": pieces.Bishop, "R": pieces.Rook,
+              "Q": pieces.Queen, "K": pieces.King}
+LETTERS = {"a": 0, "b": 1, "c": 2, "d": 3, "e": 4, "f": 5, "g": 6, "h": 7}
+
+
+def read_games(lines: Iterator[str]) -> Iterator[dict]:
+    """Yields the games of a PGN text given line by line, as
+    {"tags": {...}, "moves": [SAN moves], "result": "1-0"}
+    """
+    tags = {}
+    movetext = []
+    for line in lines:
+        line = line.strip()
+        match = TAG.match(line)
+        if match:
+            if movetext:
+                yield _make_game(tags, movetext)
+                tags, movetext = {}, []
+            tags[match.group(1)] = match.group(2)
+        elif line and not line.startswith("%"):
+            movetext.append(line)
+    if tags or movetext:
+        yield _make_game(tags, movetext)
+
+
+def _make_game(tags: dict, movetext: list) -> dict:
+    text = NOT_MOVES.sub(" ", "\n".join(movetext))
+    text = _remove_variations(text)
+    moves = []
+    result = tags.get("Result", "*")
+    for token in text.split():
+        if token in RESULTS:
+            result = token
+        else:
+            moves.append(token)
+    return {"tags": tags, "moves": moves, "result": result}
+
+
+def _remove_variations(text: str) -> str:
+    if "(" not in text:
+        return text
+    kept = []
+    depth = 0
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            kept.append(char)
+    return "".join(kept)
+
+
+def san_to_move(board: ChessBoard, san: str) -> tuple:
+    """Converts a SAN move like "Nbd7", "exd6", "e8=Q" or "O-O" to the
+    (origin, target, promotion) of the matching legal move, with the
+    tiles as (row, col) like UserInterface.parse_input() gives them
+    """
+    san = san.rstrip("+#!?")
+    legal_moves = board.legal_moves()
+    if san in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        row = 0 if board.turn == "W" else 7
+        col = 6 if len(san) == 3 else 2
+        for origin, target, promotion in legal_moves:
+            if target == (row, col) and origin == (row, 4) and \
+                    type(board.state[row][4]) is pieces.King:
+                return origin, target, promotion
+        raise ValueError(f"Illegal move: {san}")
+
+    match = SAN.match(san)
+    if match is None:
+        raise ValueError(f"Not a SAN move: {san}")
+    p_type, from_col, from_row, target, promotion = match.groups()
+    p_type = SAN_PIECES[p_type] if p_type else pieces.Pawn
+    target = (int(target[1]) - 1, LETTERS[target[0]])
+    promotion = SAN_PIECES[promotion] if promotion else None
+    if p_type is pieces.Pawn and promotion is None and \
+            target[0] in (0, 7):
+        promotion = pieces.Queen
+
+    found = [(origin, trgt, promo) for origin, trgt, promo in legal_moves
+             if trgt == target and promo is promotion and
+             type(board.state[origin[0]][origin[1]]) is p_type and
+             (from_col is None or origin[1] == LETTERS[from_col]) and
+             (from_row is None or origin[0] == int(from_row) - 1)]
+    if len(found) != 1:
+        raise ValueError(f"Illegal or ambiguous move: {san}")
+    return found[0]
+
+
+def replay(game: dict, skip_print: bool = True) -> ChessBoard:
+    """Plays the moves of a game read by read_games() on a new board,
+    from the FEN tag position when the game has one
+    """
+    board = ChessBoard(game["tags"].get("FEN", chesspiece.START_FEN))
+    board.make_board()
+    for san in game["moves"]:
+        origin, target, promotion = san_to_move(board, san)
+        board.update_board(origin, target, promotion, skip_print)
+        board.move += 1
+    return board
+
+
+def import_games(path: str, store: gamestore.GameStore = None) -> dict:
+    """Replays every game of a PGN file, optionally adding them to a
+    game store. Games with illegal moves are skipped, as are games
+    starting from a FEN position when storing, since the store
+    keeps games from the starting position. Returns the counts and
+    the rate.
+    """
+    games = skipped = 0
+    start = time.perf_counter()
+    with open(path, encoding="utf-8", errors="replace") as pgn_file:
+        for game in read_games(pgn_file):
+            if store is not None and "FEN" in game["tags"]:
+                skipped += 1
+                continue
+            try:
+                board = replay(game)
+            except ValueError as _:
+                skipped += 1
+                continue
+            games += 1
+            if store is not None:
+                store.append(gamestore.moves_of(board),
+                             RESULTS.get(game["result"], gamestore.UNFINISHED))
+    elapsed = time.perf_counter() - start
+    return {"games": games, "skipped": skipped, "seconds": elapsed,
+            "games_per_second": games / elapsed if elapsed > 0 else 0}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay the games of a "
+                                                 "PGN file")
+    parser.add_argument("path")
+    parser.add_argument("--store", action="store_true",
+                        help="add the games to the game store")
+    args = parser.parse_args()
+
+    store = gamestore.GameStore() if args.store else None
+    report = import_games(args.path, store)
+    print(f"{report['games']} games replayed, {report['skipped']} skipped",
+          end=" ")
+    print(f"in {report['seconds']:.2f} s,", end=" ")
+    print(f"{report['games_per_second']:.1f} games/s")
@@ -1,23 +1,112 @@
 import copy
 from typing import Tuple, Any
+from bitboard import (WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING,
+                      COLORS, COLOR_INDEX)
+from movetables import (ROOK_DIRECTIONS, BISHOP_DIRECTIONS, QUEEN_DIRECTIONS,
+                        KNIGHT_MOVEMENTS, KING_MOVEMENTS, KNIGHT_TARGETS,
+                        KING_TARGETS, RAYS, PAWN_PUSHES, PAWN_CAPTURES,
+                        PAWN_SIDES, PAWN_DIRECTION, PROMOTION_TILES)
+import events
+import tablebase
+
+
+class PieceInfo:
+    """Dictionary like view of a piece, returned by get_info(). Reads and
+    writes go to the attributes of the piece, so the view stays up to
+    date with the piece. Two views are equal when they are views of the
+    same piece.
+    """
+    __slots__ = ("piece",)
+
+    def __init__(self, piece: "Piece"):
+        self.piece = piece
+
+    def __getitem__(self, key: str):
+        piece = self.piece
+        if key == "type":
+            return piece.TYPE
+        if key == "color":
+            return COLORS[piece.side]
+        if key == "symbol":
+            return piece.SYMBOL
+        if key in piece.FIELDS:
+            return getattr(piece, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.piece.FIELDS:
+            raise KeyError(key)
+        setattr(self.piece, key, value)
+
+    def get(self, key: str, default: Any = None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> tuple:
+        return ("type", "color", "symbol") + self.piece.FIELDS
+
+    def items(self) -> list:
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PieceInfo):
+            return self.piece is other.piece
+        if isinstance(other, dict):
+            return dict(self.items()) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
 
 
 class Piece:
     """Base class for chess Pieces. Contains the basics
     functions needed by other chesspiece classes.
+
+    Pieces store their state in slots: side is the color code (WHITE or
+    BLACK) and KIND the type code shared by the class. The old info
+    dictionary is still available as a view through get_info().
     """
+    __slots__ = ("side", "position", "moved")
+
+    TYPE = None
+    KIND = None
+    SYMBOL = {}
+    FIELDS = ("position", "moved")
+
+    def __init__(self, position: tuple, color: str):
+        self.side = COLOR_INDEX[color]
+        self.position = position
+        self.moved = False
+
+    @property
+    def info(self) -> PieceInfo:
+        return PieceInfo(self)
 
     def get_position(self):
-        return self.info['position']
+        return self.position
 
     def set_position(self, position: tuple):
-        self.info['position'] = position
+        self.position = position
 
     def get_info(self):
-        return self.info
+        return PieceInfo(self)
 
     def set_moved(self):
-        self.info['moved'] = True
+        self.moved = True
 
     @staticmethod
     def chess_format(loc_piece: tuple):
@@ -31,164 +120,161 @@ class Piece:
         return colors.get(color_key)
 
     def check_move(self, trgt_tile: tuple,
-                   board_state: list, p_color: str) -> bool:
+                   board_state: list, p_color: str,
+                   skip_print: bool = False) -> bool:
         """Checks if the chess move the player attemps is legal or not.
 
         t_tile : target tile
         board_state: chessboard list
         p_color: player color
+
+        Illegal moves are reported as events unless skip_print is set.
         """
 
-        if p_color == self.info['color']:
+        if COLOR_INDEX[p_color] == self.side:
             viable_moves = self._get_moves(board_state)
             if trgt_tile in viable_moves:
                 piece = board_state[trgt_tile[0]][trgt_tile[1]]
-                if not self.info['moved']:
+                if not self.moved:
                     self.set_moved()
                 if piece is None:
-                    if self.info['type'] == "pawn":
+                    if self.KIND == PAWN:
                         self._is_promotion(trgt_tile)
                         self._check_en_passant(trgt_tile)
                         return True
                     else:
                         return True
                 else:
-                    if piece.info['type'] != "king":
-                        if self.info['type'] == "pawn":
+                    if piece.KIND != KING:
+                        if self.KIND == PAWN:
                             self._is_promotion(trgt_tile)
                             return True
                         else:
                             return True
                     else:
-                        print("A King can only check mated - not eaten")
+                        self._report_illegal(board_state, "king_capture",
+                                             skip_print)
                         return False
             else:
                 return False
         else:
-            print(f"Cannot move pieces not belonging own color")
+            self._report_illegal(board_state, "wrong_color", skip_print)
             return False
 
+    @staticmethod
+    def events_of(board_state: list) -> events.EventHub:
+        """Event hub of the ChessBoard of board_state, or the hub of
+        plain lists
+        """
+        board = getattr(board_state, "board", None)
+        return events.hub if board is None else board.events
+
+    def _report_illegal(self, board_state: list, reason: str,
+                        skip_print: bool):
+        event_hub = self.events_of(board_state)
+        if not skip_print and event_hub.active:
+            event_hub.emit("illegal", reason=reason)
+
     def _rook_bishop_queen_move_check(self, board_state: list):
         """Combined move checking for rook, bishop and queen. Between
         the pieces only the allowed tile movement differs, the logic for
         checking viable moves is same.
         """
-        row, col = self.info["position"]
-        viable_moves = []
-
-        for row2, col2 in self.TILE_MOVEMENTS:
-            trgt_row, trgt_col = row + row2, col + col2
-            while 0 <= trgt_row < 8 and 0 <= trgt_col < 8:
-                if board_state[trgt_row][trgt_col] is None:
-                    viable_moves.append((trgt_row, trgt_col))
+        return list(self._iter_sliding_moves(board_state))
+
+    def _iter_sliding_moves(self, board_state: list):
+        """Generator version of _rook_bishop_queen_move_check()
+        """
+        row, col = self.position
+        sq = row * 8 + col
+        side = self.side
+
+        for direction in self.TILE_MOVEMENTS:
+            for trgt_row, trgt_col in RAYS[direction][sq]:
+                piece = board_state[trgt_row][trgt_col]
+                if piece is None:
+                    yield trgt_row, trgt_col
                 else:
-                    if board_state[trgt_row][trgt_col].info['color'] \
-                            != self.info['color']:
-                        viable_moves.append((trgt_row, trgt_col))
+                    if piece.side != side:
+                        yield trgt_row, trgt_col
                     break
-                trgt_row += row2
-                trgt_col += col2
-        return viable_moves
 
 
 class Pawn(Piece):
+    __slots__ = ("en_passant", "can_en_passant", "promotion")
+
+    TYPE = "pawn"
+    KIND = PAWN
+    SYMBOL = {"W": "\u2659", "B": "\u265F"}
+    FIELDS = Piece.FIELDS + __slots__
 
     def __init__(self, position: tuple, color: str):
-        self.info = {"type": "pawn",
-                     "color": color,
-                     "position": position,
-                     "symbol": {"W": "\u2659", "B": "\u265F"},
-                     "moved": False,
-                     "en_passant": False,
-                     "can_en_passant": False,
-                     "promotion": False}
-        self.TILE_MOVEMENTS_WHITE = [(1, 0)]
-        self.TILE_MOVEMENTS_BLACK = [(-1, 0)]
-        self.WHITE_attack = [(1, 1), (1, -1)]
-        self.BLACK_attack = [(-1, -1), (-1, 1)]
-        self.WHITE_PROMOTION = [(7, 0), (7, 1), (7, 2), (7, 3),
-                                (7, 4), (7, 5), (7, 6), (7, 7)]
-        self.BLACK_PROMOTION = [(0, 0), (0, 1), (0, 2), (0, 3),
-                                (0, 4), (0, 5), (0, 6), (0, 0)]
-        self.EN_PASSANT_CHECK = [(0, 1), (0, -1)]
-        self.EN_PASSANT_MOVE = {"W": (1, 0), "B": (-1, 0)}
-
-    def white_or_black_movement(self):
-        return self.TILE_MOVEMENTS_WHITE \
-            if self.info['color'] == "W" else self.TILE_MOVEMENTS_BLACK
-
-    def white_or_black_attack(self):
-        return self.WHITE_attack \
-            if self.info['color'] == "W" else self.BLACK_attack
-
-    def initial_movement(self):
-        return [(2, 0)] if self.info['color'] == "W" else [(-2, 0)]
+        super().__init__(position, color)
+        self.en_passant = False
+        self.can_en_passant = False
+        self.promotion = False
 
     def get_promotion_tile(self):
-        if self.info['color'] == "W":
-            return self.WHITE_PROMOTION
-        else:
-            return self.BLACK_PROMOTION
+        return PROMOTION_TILES[self.side]
 
     def _get_moves(self, board_state: list) -> list:
         """Pawn movement, regular and attack pattern with initial 2 step move.
         """
+        return list(self._iter_moves(board_state))
 
-        row, col = self.info["position"]
-        viable_moves = []
-        moveset = copy.copy(self.white_or_black_movement())
-        # check if piece has moved or not, if not append the moveset list
-        if not self.info['moved']:
-            moveset.extend(self.initial_movement())
-        # pawn regular movement
-        for row2, col2 in moveset:
-            trgt_row, trgt_col = row + row2, col + col2
-            if 0 <= trgt_row < 8 and 0 <= trgt_col < 8:
-                if board_state[trgt_row][trgt_col] is None:
-                    viable_moves.append((trgt_row, trgt_col))
-                else:
-                    break
+    def _iter_moves(self, board_state: list):
+        """Generator version of _get_moves(), the moves come one at a
+        time so a caller can stop at the first one it needs
+        """
+
+        row, col = self.position
+        sq = row * 8 + col
+        side = self.side
+        # pawn regular movement, two tiles from the starting row
+        for trgt_row, trgt_col in PAWN_PUSHES[side][sq]:
+            if board_state[trgt_row][trgt_col] is None:
+                yield trgt_row, trgt_col
+            else:
+                break
         # pawn piece capturing
-        for row3, col3 in self.white_or_black_attack():
-            trgt_row2, trgt_col2 = row + row3, col + col3
-            if 0 <= trgt_row2 < 8 and 0 <= trgt_col2 < 8:
-                if board_state[trgt_row2][trgt_col2] is not None:
-                    if board_state[trgt_row2][trgt_col2].info['color'] \
-                        != self.info['color']:
-                        viable_moves.append((trgt_row2, trgt_col2))
-        # pawn en_passant
-        for row4, col4 in self.EN_PASSANT_CHECK:
-            trgt_row, trgt_col = row + row4, col + col4
-            if 0 <= trgt_row < 8 and 0 <= trgt_col < 8:
-                piece = board_state[trgt_row][trgt_col]
-                if piece is not None:
-                    if (piece.info['color'] != self.info['color']
-                        and piece.info['type'] == "pawn"):
-                        if piece.info["en_passant"]:
-                            row_move, col_move = self.EN_PASSANT_MOVE.get(
-                                self.info['color'])
-                            trgt_row, trgt_col = trgt_row + row_move, 
-                            trgt_col + col_move
-                            viable_moves.append((trgt_row, trgt_col))
-                            self.info['can_en_passant'] = True
-
-        return viable_moves
+        for trgt_row, trgt_col in PAWN_CAPTURES[side][sq]:
+            piece = board_state[trgt_row][trgt_col]
+            if piece is not None and piece.side != side:
+                yield trgt_row, trgt_col
+        # pawn en_passant, from the board or from the passed pawn's flag
+        board = getattr(board_state, "board", None)
+        if board is not None:
+            en_passant = board.en_passant
+            if en_passant is not None and \
+                    en_passant[0] == (5 if side == WHITE else 2) and \
+                    en_passant in PAWN_CAPTURES[side][sq]:
+                self.can_en_passant = True
+                yield en_passant
+            return
+
+        for trgt_row, trgt_col in PAWN_SIDES[sq]:
+            piece = board_state[trgt_row][trgt_col]
+            if piece is not None:
+                if piece.side != side and piece.KIND == PAWN:
+                    if piece.en_passant:
+                        self.can_en_passant = True
+                        yield trgt_row + PAWN_DIRECTION[side], trgt_col
 
     def _check_en_passant(self, trgt_tile: tuple):
         """Checks if pawn makes a move that viable for it to be
         en passant by opposing pawn
         """
-        if not self.info['en_passant']:
-            old_tile = self.info['position']
+        if not self.en_passant:
+            old_tile = self.position
             position_difference = tuple(
                 map(lambda i, j: abs(i-j), trgt_tile, old_tile))
             if position_difference == (2, 0):
-                self.info['en_passant'] = True
+                self.en_passant = True
         else:
-            self.info['en_passant'] = False
+            self.en_passant = False
 
     def set_off_en_passant(self):
-        self.info['can_en_passant'] = False
+        self.can_en_passant = False
 
     def _is_promotion(self, trgt_tile: tuple):
         """Checks if pawn is required tile and whether it
@@ -196,102 +282,99 @@ class Pawn(Piece):
         """
         promotion_tiles = self.get_promotion_tile()
         if trgt_tile in promotion_tiles:
-            self.info["promotion"] = True
+            self.promotion = True
 
 
 class Bishop(Piece):
+    __slots__ = ()
 
-    def __init__(self, position: tuple, color: str):
-        self.info = {"type": "bishop",
-                     "color": color,
-                     "position": position,
-                     "symbol": {"W": "\u2657", "B": "\u265D"},
-                     "moved": False}
-        self.TILE_MOVEMENTS = [(-1, 1), (1, 1), (-1, -1), (1, -1)]
+    TYPE = "bishop"
+    KIND = BISHOP
+    SYMBOL = {"W": "\u2657", "B": "\u265D"}
+    TILE_MOVEMENTS = BISHOP_DIRECTIONS
 
     def _get_moves(self, board_state: list) -> list:
         return self._rook_bishop_queen_move_check(board_state)
 
+    def _iter_moves(self, board_state: list):
+        return self._iter_sliding_moves(board_state)
+
 
 class Knight(Piece):
+    __slots__ = ()
 
-    def __init__(self, position: tuple, color: str):
-        self.info = {"type": "knight",
-                     "color": color,
-                     "position": position,
-                     "symbol": {"W": "\u2658", "B": "\u265E"},
-                     "moved": False}
-        self.TILE_MOVEMENTS = [(-2, -1), (-1, -2), (1, -2), (2, -1),
-                               (-2, 1), (-1, 2), (1, 2), (2, 1)]
+    TYPE = "knight"
+    KIND = KNIGHT
+    SYMBOL = {"W": "\u2658", "B": "\u265E"}
+    TILE_MOVEMENTS = KNIGHT_MOVEMENTS
 
     def _get_moves(self, board_state: list) -> list:
+        return list(self._iter_moves(board_state))
 
-        row, col = self.info['position']
-        viable_moves = []
+    def _iter_moves(self, board_state: list):
 
-        for row2, col2 in self.TILE_MOVEMENTS:
-            trgt_row, trgt_col = row + row2, col + col2
-            if 0 <= trgt_row < 8 and 0 <= trgt_col < 8:
-                if board_state[trgt_row][trgt_col] is None:
-                    viable_moves.append((trgt_row, trgt_col))
-                else:
-                    if board_state[trgt_row][trgt_col].info['color'] \
-                            != self.info['color']:
-                        viable_moves.append((trgt_row, trgt_col))
-        return viable_moves
+        row, col = self.position
+        side = self.side
+
+        for trgt_row, trgt_col in KNIGHT_TARGETS[row * 8 + col]:
+            piece = board_state[trgt_row][trgt_col]
+            if piece is None or piece.side != side:
+                yield trgt_row, trgt_col
 
 
 class Rook(Piece):
+    __slots__ = ()
 
-    def __init__(self, position: tuple, color: str):
-        self.info = {"type": "rook",
-                     "color": color,
-                     "position": position,
-                     "symbol": {"W": "\u2656", "B": "\u265C"},
-                     "moved": False}
-        self.TILE_MOVEMENTS = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    TYPE = "rook"
+    KIND = ROOK
+    SYMBOL = {"W": "\u2656", "B": "\u265C"}
+    TILE_MOVEMENTS = ROOK_DIRECTIONS
 
     def _get_moves(self, board_state: list) -> list:
         return self._rook_bishop_queen_move_check(board_state)
 
+    def _iter_moves(self, board_state: list):
+        return self._iter_sliding_moves(board_state)
+
 
 class Queen(Piece):
+    __slots__ = ()
 
-    def __init__(self, position: tuple, color: str):
-        self.info = {"type": "queen",
-                     "color": color,
-                     "position": position,
-                     "symbol": {"W": "\u2655", "B": "\u265B"},
-                     "moved": False}
-        self.TILE_MOVEMENTS = [(-1, 1), (1, 1), (-1, -1), (1, -1),
-                               (-1, 0), (0, 1), (1, 0), (0, -1)]
+    TYPE = "queen"
+    KIND = QUEEN
+    SYMBOL = {"W": "\u2655", "B": "\u265B"}
+    TILE_MOVEMENTS = QUEEN_DIRECTIONS
 
     def _get_moves(self, board_state: list) -> list:
         return self._rook_bishop_queen_move_check(board_state)
 
+    def _iter_moves(self, board_state: list):
+        return self._iter_sliding_moves(board_state)
+
 
 class King(Piece):
     """Class for King chess piece. Contains also methods for
     temp chessboard for move viability checking, and
     methods for checking if king is check or checkmated.
     """
+    __slots__ = ("cannot_castle", "castle")
+
+    TYPE = "king"
+    KIND = KING
+    SYMBOL = {"W": "\u2654", "B": "\u265A"}
+    FIELDS = Piece.FIELDS + __slots__
+    TILE_MOVEMENTS = KING_MOVEMENTS
 
     def __init__(self, position: tuple, color: str):
-        self.info = {"type": "king",
-                     "color": color,
-                     "position": position,
-                     "symbol": {"W": "\u2654", "B": "\u265A"},
-                     "moved": False,
-                     "cannot_castle": False,
-                     "castle": False}
-        self.TILE_MOVEMENTS = [(-1, 1), (1, 1), (-1, -1), (1, -1),
-                               (-1, 0), (0, 1), (1, 0), (0, -1)]
+        super().__init__(position, color)
+        self.cannot_castle = False
+        self.castle = False
 
     def set_castle_on(self):
-        self.info["castle"] = True
+        self.castle = True
 
     def set_castle_off(self):
-        self.info["castle"] = False
+        self.castle = False
 
     def temporary_board(
             self, strt_pstn: tuple, trgt_pstn: tuple,
@@ -306,49 +389,86 @@ class King(Piece):
 
         return temp, temp[trgt_pstn[0]][trgt_pstn[1]]
 
+    def is_checked_after(
+            self, strt_pstn: tuple, trgt_pstn: tuple,
+            board_state: list, skip_print: bool = False) -> bool:
+        """Checks if the king would be checked after the move. Boards
+        owned by a ChessBoard make the move in place and take it back,
+        plain lists are tested on a temporary_board() copy.
+        """
+        board = getattr(board_state, "board", None)
+        if board is None:
+            temp_board, temp_piece = self.temporary_board(
+                strt_pstn, trgt_pstn, board_state)
+            if strt_pstn != self.position:
+                temp_piece = None
+            return self.is_checked(temp_board, temp_piece, True, skip_print)
+
+        board.make_move(strt_pstn, trgt_pstn)
+        checked = self.is_checked(board_state, None, True, skip_print)
+        board.unmake_move()
+        return checked
+
     def _get_moves(
             self, board_state: list,
             skip_castle_check: bool = False) -> list:
+        return list(self._iter_moves(board_state, skip_castle_check))
 
-        row, col = self.info['position']
-        viable_moves = []
-        row_king, col_king = self.other_king_location(board_state)
-        castling_move = [] if skip_castle_check else \
-            self._can_castle(board_state)
-
-        for row2, col2 in self.TILE_MOVEMENTS:
-            trgt_row, trgt_col = row + row2, col + col2
-            if 0 <= trgt_row < 8 and 0 <= trgt_col < 8:
-                if (abs(trgt_row - row_king) < 1 and
-                    abs(trgt_col - col_king) < 1):
-                    continue
-                piece = board_state[trgt_row][trgt_col]
-                if piece is None:
-                    viable_moves.append((trgt_row, trgt_col))
-                else:
-                    if piece.info['color'] != self.info['color']:
-                        temp_board, temp_position = self.temporary_board(
-                            self.info['position'],
-                            (trgt_row,trgt_col),
-                            board_state)
-                        if not self.is_checked(temp_board, temp_position, True):
-                            viable_moves.append((trgt_row, trgt_col))
+    def _iter_moves(
+            self, board_state: list,
+            skip_castle_check: bool = False):
+        """Generator version of _get_moves(). The castling moves come
+        last, on a ChessBoard they are only looked for when the caller
+        gets that far.
+        """
 
-        viable_moves.extend(castling_move)
+        row, col = self.position
+        side = self.side
+        row_king, col_king = self.other_king_location(board_state)
+        castling_moves = None
+        # on plain lists the king moves can set cannot_castle, so the
+        # castling is checked before them
+        if not skip_castle_check and \
+                getattr(board_state, "board", None) is None:
+            castling_moves = self._can_castle(board_state)
+
+        for trgt_row, trgt_col in KING_TARGETS[row * 8 + col]:
+            if (abs(trgt_row - row_king) < 1 and
+                abs(trgt_col - col_king) < 1):
+                continue
+            piece = board_state[trgt_row][trgt_col]
+            if piece is None:
+                yield trgt_row, trgt_col
+            else:
+                if piece.side != side:
+                    if not self.is_checked_after(
+                            self.position, (trgt_row, trgt_col),
+                            board_state, True):
+                        yield trgt_row, trgt_col
 
-        return viable_moves
+        if castling_moves is not None:
+            yield from castling_moves
+        elif not skip_castle_check:
+            yield from self._can_castle(board_state)
 
     def other_king_location(self, board_state: list):
         """Gets the location of the opposing color's king
         """
+        board = getattr(board_state, "board", None)
+        if board is not None:
+            return board.b_king if self.side == WHITE else board.w_king
+        bitboards = getattr(board_state, "bitboards", None)
+        if bitboards is not None:
+            return bitboards.king_position(COLORS[1 - self.side])
+
         other_king = None
 
         for row in range(0, 8):
             for col in range(0, 8):
                 chesspiece = board_state[row][col]
                 if chesspiece is not None:
-                    if chesspiece.info['type'] == "king":
-                        if chesspiece.info['color'] != self.info['color']:
+                    if chesspiece.KIND == KING:
+                        if chesspiece.side != self.side:
                             other_king = chesspiece
                             return other_king.get_position()
 
@@ -356,84 +476,133 @@ class King(Piece):
             self, board_state: list, temp_piece: object = None,
             skip_castle_check: bool = False,
             skip_print: bool = False) -> bool:
-        """Checks if the king is threatened by opposing color pieces
+        """Checks if the king is threatened by opposing color pieces.
+        On a ChessBoard this is a lookup in its attack maps. A check is
+        reported as an event unless skip_print is set.
         """
 
         if temp_piece is None:
-            king_location = self.get_position()
+            king_location = self.position
         else:
-            king_location = temp_piece.get_position()
+            king_location = temp_piece.position
 
-        for row in range(0, 8):
-            for col in range(0, 8):
-                chesspiece = board_state[row][col]
-                if chesspiece is not None:
-                    if chesspiece.info['color'] != self.info['color']:
-                        if chesspiece.info['type'] == "king":
-                            chesspiece_moves = chesspiece._get_moves(
-                                board_state, skip_castle_check)
-                        else:
-                            chesspiece_moves = chesspiece._get_moves(
-                                board_state)
-                        if king_location in chesspiece_moves:
-                            if not skip_print:
-                                print(f"King is checked by {chesspiece.info['type']}", end=" ")
-                                print(f"at {self.chess_format(chesspiece.info['position'])}")
-                            if not self.info['cannot_castle']:
-                                self.info['cannot_castle'] = True
-                            return True
+        other_color = COLORS[1 - self.side]
+        board = getattr(board_state, "board", None)
+        if board is not None:
+            if not board.is_attacked(king_location, other_color):
+                return False
+            if not skip_print and board.events.active:
+                row, col = board.attackers(king_location, other_color)[0]
+                board.events.emit("check", piece=board_state[row][col].TYPE,
+                                  position=(row, col))
+            if not self.cannot_castle:
+                self.cannot_castle = True
+            return True
+
+        for chesspiece in self._pieces_of_color(board_state, other_color):
+            if chesspiece.KIND == KING:
+                chesspiece_moves = chesspiece._iter_moves(
+                    board_state, skip_castle_check)
+            else:
+                chesspiece_moves = chesspiece._iter_moves(board_state)
+            if king_location in chesspiece_moves:
+                if not skip_print and events.hub.active:
+                    events.hub.emit("check", piece=chesspiece.TYPE,
+                                    position=chesspiece.position)
+                if not self.cannot_castle:
+                    self.cannot_castle = True
+                return True
 
         return False
 
-    def is_checkmate(self, board_state: list) -> bool:
-        """Checks if the king is checkmated. First checks
-        if king can move and then if other pieces can
-        help the king.
+    @staticmethod
+    def _pieces_of_color(board_state: list, color: str) -> list:
+        """Pieces of one color on the board. Uses the piece lists of
+        the bitboards when the board has them instead of visiting all
+        64 tiles.
         """
-        king_moves = self._get_moves(board_state, True)
+        bitboards = getattr(board_state, "bitboards", None)
+        if bitboards is not None:
+            return bitboards.pieces_of(color)
+        side = COLOR_INDEX[color]
+        return [chesspiece for row in board_state for chesspiece in row
+                if chesspiece is not None and chesspiece.side == side]
 
-        for move in king_moves:
-            temp_board, temp_position = self.temporary_board(
-                self.info['position'], move,
-                board_state)
-            if not self.is_checked(temp_board, temp_position, True, True):
+    def is_checkmate(self, board_state: list) -> bool:
+        """Checks if the king is checkmated. On a ChessBoard only the
+        side to move can be, by being in check without legal moves or
+        being mated now in the endgame tables when they have the
+        position. The verdict is cached by position hash.
+        """
+        board = getattr(board_state, "board", None)
+        if board is not None:
+            if board.turn != COLORS[self.side]:
+                return False
+            return board.cached(("checkmate", self.side),
+                                self._is_checkmate_on, board)
+        return self._is_checkmate(board_state)
+
+    def _is_checkmate_on(self, board) -> bool:
+        probed = tablebase.tables.probe(board)
+        if probed is not None:
+            return probed == (tablebase.LOSS, 0)
+        return self.is_checked(board.state, None, True, True) and \
+            not board.any_legal_move(COLORS[self.side])
+
+    def _is_checkmate(self, board_state: list) -> bool:
+        """First checks if king can move and then if other
+        pieces can help the king.
+        """
+        for move in self._iter_moves(board_state, True):
+            if not self.is_checked_after(
+                    self.position, move, board_state, True):
                 return False
 
-        for row in range(0, 8):
-            for col in range(0, 8):
-                chesspiece = board_state[row][col]
-                if chesspiece is not None:
-                    if chesspiece.info['color'] == self.info['color']:
-                        viable_moves = chesspiece._get_moves(board_state)
-                        for move in viable_moves:
-                            temp_board, _ = self.temporary_board(
-                                chesspiece.info['position'], move,
-                                board_state)
-                            if not self.is_checked(temp_board, None, True, True):
-                                return False
+        for chesspiece in self._pieces_of_color(board_state, COLORS[self.side]):
+            for move in chesspiece._iter_moves(board_state):
+                if not self.is_checked_after(
+                        chesspiece.position, move, board_state, True):
+                    return False
         return True
 
-    def is_stalemate(self, board_state: list) -> bool:
+    def is_stalemate(self, board_state: list,
+                     skip_print: bool = False) -> bool:
         """Checks if the game is a stalemate, i.e, the king cannot move
-        but is not in check and other pieces cannot be moved either
+        but is not in check and other pieces cannot be moved either.
+        On a ChessBoard that is the side to move having no legal moves,
+        and the verdict is cached by position hash.
         """
-        if self.is_checked(board_state):
+        if self.is_checked(board_state, None, False, skip_print):
             return False
 
-        if self._get_moves(board_state):
+        board = getattr(board_state, "board", None)
+        if board is not None:
+            if board.turn != COLORS[self.side]:
+                return False
+            return board.cached(("stalemate", self.side),
+                                self._is_stalemate_on, board)
+        return self._is_stalemate(board_state)
+
+    def _is_stalemate_on(self, board) -> bool:
+        return not board.any_legal_move(COLORS[self.side])
+
+    def _is_stalemate(self, board_state: list) -> bool:
+        if next(self._iter_moves(board_state), None) is not None:
             return False
 
-        for row in range(0, 8):
-            for col in range(0, 8):
-                chesspiece = board_state[row][col]
-                if chesspiece is not None:
-                    if chesspiece.info['color'] == self.info['color']:
-                        if chesspiece._get_moves(board_state):
-                            return False
+        for chesspiece in self._pieces_of_color(board_state, COLORS[self.side]):
+            if next(chesspiece._iter_moves(board_state), None) is not None:
+                return False
 
         return True
 
     def _can_castle(self, board_state: list):
+        """Returns the tiles the king can castle to. On a ChessBoard
+        the moves are tried in place with the standard rules,
+        plain lists use the original temporary board checks.
+        """
+        if getattr(board_state, "board", None) is not None:
+            return self._castling_moves(board_state)
 
         def check_path(col_king: int, col_rook: int):
             if col_king < col_rook:
@@ -448,22 +617,22 @@ class King(Piece):
                     return False
             return True
 
-        castling_locations = {"W": [(0, 2), (0, 6)],
-                              "B": [(7, 2), (7, 6)]}
+        castling_locations = {WHITE: [(0, 2), (0, 6)],
+                              BLACK: [(7, 2), (7, 6)]}
         castle_moves = []
         viable_castle_moves = []
-        trgt_castling = castling_locations.get(self.info["color"])
+        trgt_castling = castling_locations.get(self.side)
         rooks_not_moved = []
         # if king has been checked before it cannot castle
-        if self.info['cannot_castle']:
+        if self.cannot_castle:
             return viable_castle_moves
         # check if rooks have not moved
         for col in range(0, 8):
-            if board_state[trgt_castling[0][0]][col] is not None:
-                p_info = board_state[trgt_castling[0][0]][col].info
-                if p_info["type"] == "rook" and p_info["moved"] == False:
+            chesspiece = board_state[trgt_castling[0][0]][col]
+            if chesspiece is not None:
+                if chesspiece.KIND == ROOK and chesspiece.moved == False:
                     rooks_not_moved.append((trgt_castling[0][0], col))
-        _, col_king = self.info["position"]
+        _, col_king = self.position
         # Check if path do not contain pieces
         for index, rook in enumerate(rooks_not_moved):
             if check_path(col_king, rook[1]):
@@ -471,7 +640,7 @@ class King(Piece):
         # Check that if the castling move would put king into check
         for move in castle_moves:
             temp_board, temp_piece = self.temporary_board(
-                self.info['position'], move[0], board_state)
+                self.position, move[0], board_state)
             # check that the king old position is not checked
             if not self.is_checked(temp_board, None, True):
                 # check that the king new position is not checked
@@ -480,3 +649,35 @@ class King(Piece):
                     self.set_castle_on()
 
         return viable_castle_moves
+
+    def _castling_moves(self, board_state: list) -> list:
+        """Castling when the king and the rook have not moved, the tiles
+        between them are empty and the king is not in check, nor passes
+        or lands on a tile attacked by the opposing color.
+        """
+        row, col = self.position
+        home_row = 0 if self.side == WHITE else 7
+        viable_castle_moves = []
+        if self.moved or (row, col) != (home_row, 4):
+            return viable_castle_moves
+        if self.is_checked(board_state, None, True, True):
+            return viable_castle_moves
+
+        for col_rook, step in ((0, -1), (7, 1)):
+            rook = board_state[row][col_rook]
+            if rook is None or rook.KIND != ROOK or \
+                    rook.side != self.side or rook.moved:
+                continue
+            start, stop = sorted((col, col_rook))
+            if any(board_state[row][between] is not None
+                   for between in range(start + 1, stop)):
+                continue
+            if self.is_checked_after((row, col), (row, col + step),
+                                     board_state, True):
+                continue
+            if self.is_checked_after((row, col), (row, col + 2 * step),
+                                     board_state, True):
+                continue
+            viable_castle_moves.append((row, col + 2 * step))
+
+        return viable_castle_moves
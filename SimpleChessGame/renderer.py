@@ -0,0 +1,144 @@
+"""Terminal rendering of a ChessBoard. A frame is built as one string and
+written with a single write. In diff mode only the squares and the move
+counter that changed since the last frame are redrawn, by moving the
+cursor back up into the previous frame. Text written between the frames
+has to go through write_text(), so the renderer knows how far below the
+frame the cursor is; after MAX_LINES_BELOW lines a whole frame is drawn
+again, as the old one may have scrolled away.
+"""
+import sys
+from colorama import Back, Style
+from bitboard import COLORS
+
+HEADER = "  || a    b    c    d    e    f    g    h || "
+BORDER = "#" * 2 + "||" + "#" * 38 + "||" + "#" * 2
+FRAME_WIDTH = 46
+# lines of a frame, and the frame lines of the 8th row and the move counter
+FRAME_LINES = 15
+FIRST_ROW_LINE = 5
+MOVE_LINE = 1
+MAX_LINES_BELOW = 8
+TILE_COLORS = (Back.CYAN + Style.DIM, Back.MAGENTA + Style.DIM)
+
+
+def format_line(title: str, sepator: str,
+                fill_char: str, txt_lenght: int = 40) -> str:
+    """Returns a line of text based on user input
+
+     title is title of the text.
+     seperator: str (separates the space between
+     the text and filler letters).
+     fill_char: str (fills the empty parts of str lenght).
+     txt_lenght (lenght of the text)
+
+    """
+    def see_if_rounded(txt_lenght):
+        return round(number=txt_lenght, ndigits=None) < txt_lenght or \
+            round(number=txt_lenght, ndigits=None) > txt_lenght
+
+    txt_lenght -= len(title)
+    odd = see_if_rounded(txt_lenght/2)
+    txt_lenght = txt_lenght // 2
+    if len(title) > 0:
+        base_str = fill_char * max(txt_lenght - 1, 0)
+        title = sepator.join([base_str, title])
+        title = sepator.join([title, base_str])
+        title += fill_char if odd else ''
+    else:
+        title = fill_char * txt_lenght * 2
+    return title
+
+
+class BoardRenderer():
+    """Draws ChessBoards to stream. With diff on, every frame after the
+    first one only redraws what changed.
+    """
+
+    def __init__(self, stream=None, diff: bool = False):
+        self.stream = stream
+        self.diff = diff
+        self.last_tiles = None
+        self.last_move = None
+        # text lines written under the last whole frame
+        self.lines_below = 0
+
+    def reset(self):
+        """Draws a whole frame next time, like for another board
+        """
+        self.last_tiles = None
+        self.last_move = None
+
+    @staticmethod
+    def tile(symbol: str, row: int, col: int) -> str:
+        return TILE_COLORS[(row + col + 1) % 2] + f"| {symbol} |" + \
+            Style.RESET_ALL
+
+    @staticmethod
+    def symbols(board) -> list:
+        """Symbol of every tile, from the 8th row to the 1st
+        """
+        return [piece.SYMBOL[COLORS[piece.side]] if piece is not None else "x"
+                for row in range(board.y - 1, -1, -1)
+                for piece in board.state[row]]
+
+    def frame(self, board, tiles: list) -> str:
+        lines = [format_line("SIMPLE CHESS", " ", "-", FRAME_WIDTH),
+                 self._move_line(board), "", HEADER, BORDER]
+        for index in range(board.y):
+            row = board.y - 1 - index
+            cells = "".join(self.tile(tiles[index * 8 + col], row, col)
+                            for col in range(board.x))
+            lines.append(f"{row+1} |{cells}| {row+1}")
+        lines.extend((BORDER, HEADER))
+        return "\n".join(lines) + "\n"
+
+    def changes(self, board, tiles: list) -> str:
+        """Cursor movements and tiles that turn the last frame into
+        this one. The cursor is left below the frame.
+        """
+        parts = []
+        if board.move != self.last_move:
+            parts.append(self._patch(MOVE_LINE, 1, "\x1b[2K" +
+                                     self._move_line(board)))
+        for index, symbol in enumerate(tiles):
+            if symbol == self.last_tiles[index]:
+                continue
+            line, col = divmod(index, 8)
+            parts.append(self._patch(FIRST_ROW_LINE + line, 4 + col * 5,
+                                     self.tile(symbol, board.y - 1 - line,
+                                               col)))
+        return "".join(parts)
+
+    def render(self, board):
+        tiles = self.symbols(board)
+        if self.diff and self.last_tiles is not None and \
+                self.lines_below <= MAX_LINES_BELOW:
+            output = self.changes(board, tiles)
+        else:
+            output = self.frame(board, tiles)
+            self.lines_below = 0
+        stream = self.stream or sys.stdout
+        stream.write(output)
+        stream.flush()
+        self.last_tiles = tiles
+        self.last_move = board.move
+
+    def write_text(self, text: str):
+        """Writes text under the frame, keeping count of its lines
+        """
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+        self.lines_below += text.count("\n")
+
+    @staticmethod
+    def _move_line(board) -> str:
+        return format_line(f"Move: {board.move}", " ", ".", FRAME_WIDTH)
+
+    def _patch(self, frame_line: int, col: int, text: str) -> str:
+        """Writes text at a line and 1-based column of the last frame,
+        moving the cursor there from below the frame and the text
+        written after it, and back
+        """
+        lines_up = FRAME_LINES - frame_line + self.lines_below
+        return f"\x1b[{lines_up}F\x1b[{col}G{text}\x1b[{lines_up}E"
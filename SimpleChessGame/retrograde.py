@@ -0,0 +1,265 @@
+"""Generates the endgame tables of tablebase.py by retrograde analysis.
+All positions of an ending are set up at once in NumPy arrays together
+with the positions every legal move leads to, using the move tables of
+movetables.py. Mates and stalemates are found first, then going back
+one ply at a time: a position is won in n plies when a move leads to a
+position lost in n - 1, and lost in n when every move leads to a
+position won in fewer plies. Positions left at the end are draws.
+
+KPK needs the KQK and KRK tables for its promotions, so the tables are
+made in the order KQK, KRK, KPK.
+
+    python retrograde.py
+    python retrograde.py kqk krk --output tables/
+"""
+import argparse
+import os
+import time
+import numpy as np
+from bitboard import WHITE, PAWN, ROOK, QUEEN, attacks
+from movetables import (KING_ATTACKS, RAY_SQUARES, BETWEEN,
+                        ROOK_DIRECTIONS, QUEEN_DIRECTIONS, KING_TARGETS)
+from tablebase import Tablebase, TABLES, TABLE_SIZE, table_index
+
+TRIPLES = 1 << 18
+# outcomes while generating
+UNKNOWN, WON, LOST, DRAWN = 0, 1, 2, 3
+DIRECTIONS = {QUEEN: QUEEN_DIRECTIONS, ROOK: ROOK_DIRECTIONS}
+
+
+def _king_targets() -> np.ndarray:
+    targets = np.full((64, 8), -1, dtype=np.int64)
+    for sq, tiles in enumerate(KING_TARGETS):
+        for slot, (row, col) in enumerate(tiles):
+            targets[sq, slot] = row * 8 + col
+    return targets
+
+
+def _rays(kind: int) -> np.ndarray:
+    """RAYS[sq, direction, distance] of a sliding piece type, -1 off
+    the board
+    """
+    rays = np.full((64, len(DIRECTIONS[kind]), 7), -1, dtype=np.int64)
+    for slot, direction in enumerate(DIRECTIONS[kind]):
+        for sq, ray in enumerate(RAY_SQUARES[direction]):
+            rays[sq, slot, :len(ray)] = ray
+    return rays
+
+
+KING_MOVES = _king_targets()
+ADJACENT = np.array([[KING_ATTACKS[sq] >> trgt_sq & 1 for trgt_sq in range(64)]
+                     for sq in range(64)], dtype=bool)
+BETWEEN_BITS = np.array(BETWEEN, dtype=np.uint64)
+
+
+def _bit(masks: np.ndarray, squares: np.ndarray) -> np.ndarray:
+    return (masks >> squares.astype(np.uint64)) & np.uint64(1) == 1
+
+
+class Ending():
+    """The positions of one table, indexed like the table file, with
+    the moves out of them
+    """
+
+    def __init__(self, kind: int, known: dict):
+        self.kind = kind
+        triple = np.arange(TRIPLES, dtype=np.int64)
+        self.strong_king = triple >> 12
+        self.lone_king = triple >> 6 & 63
+        self.piece = triple & 63
+        strong_king, lone_king, piece = \
+            self.strong_king, self.lone_king, self.piece
+
+        exists = (strong_king != lone_king) & (strong_king != piece) & \
+            (lone_king != piece)
+        if kind == PAWN:
+            exists &= (piece >= 8) & (piece < 56)
+        adjacent = ADJACENT[strong_king, lone_king]
+        piece_attacks = np.array([attacks(kind, WHITE, sq, 0)
+                                  for sq in range(64)], dtype=np.uint64)
+        lone_checked = adjacent | (
+            _bit(piece_attacks[piece], lone_king) &
+            ~_bit(BETWEEN_BITS[piece, lone_king], strong_king))
+        # legal positions with the strong side and the lone king to move
+        self.legal = np.concatenate((exists & ~lone_checked,
+                                     exists & ~adjacent))
+        self.in_check = np.concatenate((np.zeros(TRIPLES, dtype=bool),
+                                        lone_checked))
+
+        # every value the moves can lead to: this table, a draw, no
+        # move and the tables the pawn promotes into
+        self.draw = 2 * TRIPLES
+        self.none = self.draw + 1
+        self.offsets = {}
+        outcomes = [np.zeros(2 * TRIPLES, dtype=np.int8),
+                    np.array([DRAWN, UNKNOWN], dtype=np.int8)]
+        plies = [np.zeros(2 * TRIPLES, dtype=np.int16),
+                 np.zeros(2, dtype=np.int16)]
+        offset = self.none + 1
+        for promoted, values in known.items():
+            self.offsets[promoted] = offset
+            values = values.astype(np.int16)
+            outcomes.append(np.where(values == 0, DRAWN,
+                                     np.where(values % 2 == 0, WON, LOST))
+                            .astype(np.int8))
+            plies.append(np.maximum(values - 1, 0))
+            offset += TABLE_SIZE
+        self.outcome = np.concatenate(outcomes)
+        self.plies = np.concatenate(plies)
+        strong = self.strong_moves()
+        lone = self.lone_moves()
+        padding = np.full((TRIPLES, strong.shape[1] - lone.shape[1]),
+                          self.none)
+        self.moves = np.concatenate((strong, np.hstack((lone, padding)))) \
+            .astype(np.int32)
+
+    def strong_moves(self) -> np.ndarray:
+        """Where the moves of the strong side lead, none for illegal
+        positions and unused slots
+        """
+        strong_king, lone_king, piece = \
+            self.strong_king, self.lone_king, self.piece
+        moves = []
+        for slot in range(8):
+            target = KING_MOVES[strong_king, slot]
+            result = table_index(1, target, lone_king, piece)
+            moves.append(self._legal_move((target >= 0) & (target != piece),
+                                          result))
+        if self.kind == PAWN:
+            moves.extend(self._pawn_moves())
+        else:
+            rays = _rays(self.kind)[piece]
+            for direction in range(rays.shape[1]):
+                blocked = np.zeros(TRIPLES, dtype=bool)
+                for distance in range(7):
+                    target = rays[:, direction, distance]
+                    blocked |= (target < 0) | (target == lone_king)
+                    blocked |= target == strong_king
+                    result = table_index(1, strong_king, lone_king, target)
+                    moves.append(self._legal_move(~blocked, result))
+        moves = np.stack(moves, axis=1)
+        moves[~self.legal[:TRIPLES]] = self.none
+        return moves
+
+    def _pawn_moves(self) -> list:
+        strong_king, lone_king, piece = \
+            self.strong_king, self.lone_king, self.piece
+        push = piece + 8
+        free = (push != strong_king) & (push != lone_king) & (push < 64)
+        promotes = push >= 56
+        moves = [self._legal_move(free & ~promotes,
+                                  table_index(1, strong_king, lone_king,
+                                              push))]
+        double = piece + 16
+        moves.append(self._legal_move(
+            free & (piece < 16) & (double != strong_king) &
+            (double != lone_king),
+            table_index(1, strong_king, lone_king, double)))
+        for promoted in (QUEEN, ROOK):
+            moves.append(np.where(
+                free & promotes,
+                self.offsets[promoted] +
+                table_index(1, strong_king, lone_king, push & 63),
+                self.none).astype(np.int32))
+        # a bishop or a knight cannot win
+        moves.append(np.where(free & promotes, self.draw,
+                              self.none).astype(np.int32))
+        return moves
+
+    def lone_moves(self) -> np.ndarray:
+        strong_king, lone_king, piece = \
+            self.strong_king, self.lone_king, self.piece
+        moves = []
+        for slot in range(8):
+            target = KING_MOVES[lone_king, slot]
+            on_board = target >= 0
+            moves.append(self._legal_move(
+                on_board & (target != piece),
+                table_index(0, strong_king, target, piece)))
+            # taking the piece leaves two kings, when it is not defended
+            moves[-1] = np.where(on_board & (target == piece) &
+                                 ~ADJACENT[strong_king, target],
+                                 self.draw, moves[-1]).astype(np.int32)
+        moves = np.stack(moves, axis=1)
+        moves[~self.legal[TRIPLES:]] = self.none
+        return moves
+
+    def _legal_move(self, possible: np.ndarray,
+                    result: np.ndarray) -> np.ndarray:
+        result = np.where(possible, result, 0)
+        return np.where(possible & self.legal[result], result,
+                        self.none).astype(np.int32)
+
+    def solve(self) -> np.ndarray:
+        """Runs the retrograde analysis. Returns the table bytes.
+        """
+        outcome, plies, moves = self.outcome, self.plies, self.moves
+        legal = self.legal
+        has_moves = (moves != self.none).any(axis=1)
+        outcome[:2 * TRIPLES][legal & ~has_moves & self.in_check] = LOST
+        outcome[:2 * TRIPLES][legal & ~has_moves & ~self.in_check] = DRAWN
+        longest = int(plies[self.none + 1:].max(initial=0))
+
+        ply = 1
+        last_change = 0
+        while ply <= max(last_change, longest) + 2:
+            rows = np.nonzero(legal & (outcome[:2 * TRIPLES] == UNKNOWN))[0]
+            row_moves = moves[rows]
+            after = outcome[row_moves]
+            after_plies = plies[row_moves]
+            if ply % 2:
+                found = ((after == LOST) & (after_plies == ply - 1)).any(axis=1)
+                result = WON
+            else:
+                found = ((row_moves == self.none) |
+                         ((after == WON) & (after_plies <= ply - 1))).all(axis=1)
+                result = LOST
+            if found.any():
+                outcome[rows[found]] = result
+                plies[rows[found]] = ply
+                last_change = ply
+            ply += 1
+
+        decided = (outcome[:2 * TRIPLES] == WON) | \
+            (outcome[:2 * TRIPLES] == LOST)
+        return np.where(decided, plies[:2 * TRIPLES] + 1, 0).astype(np.uint8)
+
+
+def generate(name: str, directory: str) -> np.ndarray:
+    """Makes the table name ("kqk", "krk" or "kpk") and writes it to
+    directory, reading the tables it promotes into from there
+    """
+    kind = {table: kind for kind, table in TABLES.items()}[name]
+    known = {}
+    if kind == PAWN:
+        tablebase = Tablebase(directory)
+        for promoted in (QUEEN, ROOK):
+            known[promoted] = np.fromfile(tablebase.path(TABLES[promoted]),
+                                          dtype=np.uint8)
+    table = Ending(kind, known).solve()
+    table.tofile(Tablebase(directory).path(name))
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate endgame tables")
+    parser.add_argument("tables", nargs="*",
+                        help="kqk, krk or kpk, all of them by default")
+    parser.add_argument("--output", default=None,
+                        help="directory of the tables")
+    args = parser.parse_args()
+    for name in args.tables:
+        if name not in TABLES.values():
+            parser.error(f"unknown table: {name}")
+    names = args.tables or ["kqk", "krk", "kpk"]
+    directory = args.output or Tablebase().directory
+    os.makedirs(directory, exist_ok=True)
+
+    for name in names:
+        start = time.perf_counter()
+        table = generate(name, directory)
+        plies = table.astype(np.int16) - 1
+        wins = np.count_nonzero((table > 0) & (plies % 2 == 1))
+        print(f"{name}: {wins} won positions, longest mate", end=" ")
+        print(f"{(plies.max() + 1) // 2} moves, {table.nbytes} bytes,", end=" ")
+        print(f"{time.perf_counter() - start:.1f} s")
@@ -0,0 +1,297 @@
+"""Computer player: negamax alpha-beta search with iterative deepening.
+
+Every depth is searched in full before the next one is started, and the
+best move of the deepest finished depth is played. The search stops as
+soon as the time or node budget runs out, so a move always comes back
+within the budget. The transposition table is only used to try the
+best move of earlier searches first; scores are never taken from it,
+so a given depth always gives the same result. With an opening book
+the most played book move is taken without searching, and positions
+found in the endgame tables get their exact score from them.
+
+    python search.py --time 2
+    python search.py "<FEN>" --depth 4
+    python search.py --book book.bin
+    python search.py "8/8/8/4k3/8/8/8/4K2R w - - 0 1" --tables .
+"""
+import argparse
+import time
+import chesspiece
+from bitboard import COLOR_INDEX, KING
+from chessboard import ChessBoard
+from evaluation import evaluate, PIECE_VALUES
+from fen import FEN_LETTERS, LETTERS
+from openingbook import OpeningBook
+from tablebase import Tablebase, WIN, LOSS
+from transposition import TranspositionTable
+
+INFINITY = 1000000
+MATE = 100000
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def move_name(move: tuple) -> str:
+    """Move in coordinate notation, like "e2e4" or "a7a8q"
+    """
+    origin, target, promotion = move
+    name = f"{LETTERS[origin[1]]}{origin[0] + 1}{LETTERS[target[1]]}{target[0] + 1}"
+    if promotion is not None:
+        name += FEN_LETTERS[promotion]
+    return name
+
+
+def order_moves(board: ChessBoard, moves: list, first: tuple = None) -> list:
+    """Captures first, most valuable victim by least valuable attacker,
+    then promotions and the rest in generation order. first, like the
+    best move of an earlier search, goes before all of them.
+    """
+    state = board.state
+
+    def priority(move: tuple) -> int:
+        if move == first:
+            return -INFINITY
+        origin, target, promotion = move
+        captured = state[target[0]][target[1]]
+        score = 0
+        if captured is not None:
+            piece = state[origin[0]][origin[1]]
+            score -= 10 * PIECE_VALUES[captured.KIND] - \
+                PIECE_VALUES[piece.KIND] + 1000
+        if promotion is not None:
+            score -= PIECE_VALUES[promotion.KIND]
+        return score
+
+    return sorted(moves, key=priority)
+
+
+class Search():
+    """Searches the position of a ChessBoard for the side to move.
+
+    time_limit: seconds for the whole search
+    node_limit: number of nodes for the whole search
+    max_depth: deepest iteration
+    book: opening book looked at before searching
+    tablebase: endgame tables for the positions with few pieces
+    """
+
+    # how often the clock is read, in nodes
+    CHECK_EVERY = 256
+
+    def __init__(self, board: ChessBoard, time_limit: float = None,
+                 node_limit: int = None, max_depth: int = 64,
+                 table: TranspositionTable = None, book: OpeningBook = None,
+                 tablebase: Tablebase = None):
+        self.board = board
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = max_depth
+        self.table = table or TranspositionTable(8, "depth")
+        self.book = book
+        self.tablebase = tablebase
+        self.nodes = 0
+        self.deadline = None
+        # root moves in the order the next depth would search them
+        self.root_moves = []
+
+    def search(self, verbose: bool = False) -> dict:
+        """Runs the iterative deepening. Returns the best move, its
+        score, the finished depth, the principal variation, the node
+        count, the time used, the nodes per second and whether the
+        move came from the book.
+        """
+        board = self.board
+        start = time.perf_counter()
+        self.nodes = 0
+        book_move = self.book.best_move(board) if self.book else None
+        # a hash collision or a book of other games can give a move
+        # that is not legal here, then the position is searched
+        if book_move is not None and book_move in board.legal_moves():
+            return {"move": book_move, "score": 0, "depth": 0,
+                    "pv": [book_move], "nodes": 0,
+                    "seconds": time.perf_counter() - start, "nps": 0,
+                    "book": True}
+        if self.time_limit is not None:
+            self.deadline = start + self.time_limit
+        history_length = len(board.history)
+
+        root_moves = board.legal_moves()
+        self.root_moves = root_moves
+        result = {"move": root_moves[0] if root_moves else None,
+                  "score": 0, "depth": 0, "pv": []}
+        max_depth = self.max_depth
+        if self.tablebase is not None and \
+                self.tablebase.probe(board) is not None:
+            # the tables score every move exactly at depth 1
+            max_depth = 1
+        for depth in range(1, max_depth + 1):
+            if not root_moves:
+                break
+            try:
+                score, pv = self.search_root(depth, root_moves)
+            except SearchTimeout:
+                while len(board.history) > history_length:
+                    board.unmake_move()
+                break
+            result = {"move": pv[0], "score": score, "depth": depth,
+                      "pv": pv}
+            root_moves = order_moves(board, root_moves, pv[0])
+            self.root_moves = root_moves
+            if verbose:
+                self._report(result, start)
+            if abs(score) >= MATE - depth:
+                break
+
+        elapsed = time.perf_counter() - start
+        result.update({"nodes": self.nodes, "seconds": elapsed,
+                       "nps": self.nodes / elapsed if elapsed > 0 else 0,
+                       "book": False})
+        return result
+
+    def search_root(self, depth: int, root_moves: list) -> tuple:
+        """Searches the root moves in the given order. The first move
+        with the highest score is the best one.
+        """
+        board = self.board
+        alpha = -INFINITY
+        best_pv = []
+        for move in root_moves:
+            board.make_move(*move)
+            score, pv = self.negamax(depth - 1, -INFINITY, -alpha, 1)
+            board.unmake_move()
+            score = -score
+            if score > alpha or not best_pv:
+                alpha = score
+                best_pv = [move] + pv
+        self.table.store((board.hash, "best"), best_pv[0], depth)
+        return alpha, best_pv
+
+    def negamax(self, depth: int, alpha: int, beta: int, ply: int) -> tuple:
+        """Score of the position for the side to move and the best
+        line from it, within the alpha-beta window
+        """
+        self._count_node()
+        board = self.board
+        # a position seen before on the way here or in the game, which
+        # could be repeated again, is scored as the draw it leads to
+        if board.halfmove >= 100 or board.position_counts[board.hash] > 1:
+            return 0, []
+        if self.tablebase is not None:
+            score = self.table_score(ply)
+            if score is not None:
+                return score, []
+        if depth <= 0:
+            return self.quiescence(alpha, beta), []
+        moves = board.legal_moves()
+        if not moves:
+            return (-(MATE - ply) if self._in_check() else 0), []
+
+        best_move = None
+        best_pv = []
+        for move in order_moves(board, moves,
+                                self.table.lookup((board.hash, "best"))):
+            board.make_move(*move)
+            score, pv = self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            score = -score
+            if score > alpha:
+                alpha = score
+                best_move = move
+                best_pv = [move] + pv
+                if alpha >= beta:
+                    break
+        if best_move is not None:
+            self.table.store((board.hash, "best"), best_move, depth)
+        return alpha, best_pv
+
+    def table_score(self, ply: int) -> int:
+        """Exact score of the position from the endgame tables, scored
+        like the mates found by the search, or None
+        """
+        probed = self.tablebase.probe(self.board)
+        if probed is None:
+            return None
+        result, plies = probed
+        if result == WIN:
+            return MATE - ply - plies
+        if result == LOSS:
+            return -(MATE - ply - plies)
+        return 0
+
+    def quiescence(self, alpha: int, beta: int) -> int:
+        """Follows the captures and promotions until the position is
+        quiet, so the evaluation is not taken in the middle of an
+        exchange
+        """
+        self._count_node()
+        board = self.board
+        stand_pat = evaluate(board)
+        if stand_pat >= beta:
+            return beta
+        alpha = max(alpha, stand_pat)
+        state = board.state
+        captures = [move for move in board.legal_moves()
+                    if state[move[1][0]][move[1][1]] is not None or
+                    move[2] is not None or move[1] == board.en_passant]
+        for move in order_moves(board, captures):
+            board.make_move(*move)
+            score = -self.quiescence(-beta, -alpha)
+            board.unmake_move()
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return alpha
+
+    def _in_check(self) -> bool:
+        board = self.board
+        side = COLOR_INDEX[board.turn]
+        king = board.bitboards.pieces[side][KING]
+        return bool(board.attacks[1 - side] & king)
+
+    def _count_node(self):
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout
+        if self.deadline is not None and \
+                self.nodes % self.CHECK_EVERY == 0 and \
+                time.perf_counter() > self.deadline:
+            raise SearchTimeout
+
+    def _report(self, result: dict, start: float):
+        elapsed = time.perf_counter() - start
+        nps = self.nodes / elapsed if elapsed > 0 else 0
+        print(f"depth {result['depth']} score {result['score']}", end=" ")
+        print(f"nodes {self.nodes} nps {nps:.0f}", end=" ")
+        print("pv " + " ".join(move_name(move) for move in result["pv"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search a position")
+    parser.add_argument("fen", nargs="?", default=chesspiece.START_FEN)
+    parser.add_argument("--time", type=float, default=None,
+                        help="seconds for the search")
+    parser.add_argument("--nodes", type=int, default=None)
+    parser.add_argument("--depth", type=int, default=None)
+    parser.add_argument("--book", default=None,
+                        help="opening book file to look at first")
+    parser.add_argument("--tables", default=None,
+                        help="directory of the endgame tables")
+    args = parser.parse_args()
+    if args.time is None and args.nodes is None and args.depth is None:
+        args.time = 5
+
+    board = ChessBoard(args.fen)
+    board.make_board()
+    book = OpeningBook(args.book) if args.book else None
+    tables = Tablebase(args.tables) if args.tables else None
+    search = Search(board, args.time, args.nodes, args.depth or 64,
+                    book=book, tablebase=tables)
+    result = search.search(verbose=True)
+    if result["book"]:
+        print("book move", end=" ")
+    print(f"best move {move_name(result['move'])}, {result['nodes']} nodes",
+          end=" ")
+    print(f"in {result['seconds']:.2f} s, {result['nps']:.0f} nodes/s")
@@ -0,0 +1,253 @@
+"""Chess server hosting many games at once. Every game has its own
+ChessBoard, and any number of clients can join a game over TCP.
+Commands are lines of text:
+
+    new              starts a game and joins it
+    join <number>    joins a running game
+    A2 to A3         moves a piece for the side to move
+    board            shows the board
+    quit             leaves the server
+
+The messages of a game, its moves, checks and the end, go to every
+client in it. After a move check_board_state() runs in a process pool
+on the FEN of the position, so a slow check in one game does not stall
+the others.
+
+Every connection has its own BoardRenderer. With --diff a client gets
+the whole board when it joins a game and after that only the squares
+that changed, which keeps watching many games over slow links cheap.
+
+    python server.py --port 8765 --workers 4
+    python server.py --diff
+"""
+import argparse
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import chesspiece
+from bitboard import COLORS
+from chessboard import ChessBoard
+from events import EventHub, format_event
+from renderer import BoardRenderer
+from user_interface import UserInterface
+
+HELP = "Commands: new, join <number>, A2 to A3, board, quit\n"
+
+
+def board_status(fen: str) -> tuple:
+    """check_board_state() of a position, for the process pool.
+    Returns whether the game is over and the events it reported.
+    """
+    board = ChessBoard(fen)
+    board.make_board()
+    reported = []
+    board.events.subscribe(lambda name, fields: reported.append((name,
+                                                                 fields)))
+    return board.check_board_state(), reported
+
+
+class Client():
+    """A connection to the server. Its renderer draws the boards it is
+    sent, only the changes since the last one in diff mode, and counts
+    the lines of text sent after them.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, diff: bool = False):
+        self.writer = writer
+        self.renderer = BoardRenderer(self, diff)
+
+    def write(self, text: str):
+        self.writer.write(text.encode())
+
+    def flush(self):
+        pass
+
+    def send(self, text: str):
+        self.renderer.write_text(text)
+
+    def show(self, board: ChessBoard):
+        self.renderer.render(board)
+
+
+class Game():
+    """A ChessBoard with the clients playing or watching it. The lock
+    keeps the moves of a game in order while its state is checked.
+    """
+
+    def __init__(self, number: int):
+        self.number = number
+        self.events = EventHub()
+        self.events.subscribe(self.send_event)
+        self.board = ChessBoard(chesspiece.START_FEN, events=self.events)
+        self.board.make_board()
+        self.clients = set()
+        self.lock = asyncio.Lock()
+        self.over = False
+
+    def send(self, text: str):
+        for client in self.clients:
+            client.send(text)
+
+    def send_event(self, name: str, fields: dict):
+        self.send(format_event(name, fields))
+
+    def show(self):
+        for client in self.clients:
+            client.show(self.board)
+
+
+class ChessServer():
+    """Keeps the running games and serves the clients
+    """
+
+    def __init__(self, executor: ProcessPoolExecutor, diff: bool = False):
+        self.executor = executor
+        self.diff = diff
+        self.games = {}
+        self.next_number = 1
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter):
+        game = None
+        client = Client(writer, self.diff)
+        client.send(HELP)
+        try:
+            while line := await reader.readline():
+                command = line.decode(errors="replace").strip()
+                if command.lower() == "quit":
+                    break
+                game = await self.run_command(command, game, client)
+                await writer.drain()
+        except ConnectionError as _:
+            pass
+        finally:
+            self.leave(game, client)
+            writer.close()
+
+    async def run_command(self, command: str, game: Game,
+                          client: Client) -> Game:
+        """Runs one command of a client. Returns the game the client
+        is in after it.
+        """
+        words = command.lower().split()
+        if not words:
+            return game
+        if words[0] == "new":
+            self.leave(game, client)
+            game = Game(self.next_number)
+            self.games[game.number] = game
+            self.next_number += 1
+            return self.join(game, client)
+        if words[0] == "join":
+            try:
+                joined = self.games[int(words[1])]
+            except (IndexError, ValueError, KeyError) as _:
+                client.send("No such game\n")
+                return game
+            self.leave(game, client)
+            return self.join(joined, client)
+        if game is None:
+            client.send(HELP)
+        elif words[0] == "board":
+            client.renderer.reset()
+            client.show(game.board)
+        else:
+            await self.play_move(game, command, client)
+        return game
+
+    def join(self, game: Game, client: Client) -> Game:
+        game.clients.add(client)
+        client.send(f"Game {game.number}\n")
+        client.renderer.reset()
+        client.show(game.board)
+        return game
+
+    def leave(self, game: Game, client: Client):
+        if game is None:
+            return
+        game.clients.discard(client)
+        if not game.clients:
+            self.games.pop(game.number, None)
+
+    async def play_move(self, game: Game, command: str, client: Client):
+        """Checks and makes a move like UserInterface.play_chess() and
+        checks the state of the game in the process pool
+        """
+        async with game.lock:
+            board = game.board
+            if game.over:
+                client.send("The game is over\n")
+                return
+            try:
+                p_piece, t_tile = UserInterface.parse_input(command)
+            except (IndexError, ValueError, TypeError) as _:
+                p_piece = t_tile = None
+            # parse_input() lets through tiles off the board, like e9
+            if p_piece is None or not all(
+                    row in range(8) and col in range(8)
+                    for row, col in (p_piece, t_tile)):
+                client.send(f"{UserInterface.INCORRECT_MSG}\n")
+                return
+            piece = board.state[p_piece[0]][p_piece[1]]
+            if piece is None:
+                client.send("Board index is empty - Nothing to move\n")
+                return
+            # check_move() does not see checks and pins, and it sets
+            # flags like moved, so the legal moves are looked at first
+            legal = any(move[:2] == (p_piece, t_tile)
+                        for move in board.legal_moves())
+            if (COLORS[piece.side] == board.turn and not legal) or \
+                    not piece.check_move(t_tile, board.state, board.turn):
+                client.send(f"Cannot move {piece.get_info()['type']} to "
+                            f"{piece.chess_format(t_tile)}\n")
+                return
+
+            rmvd_p_info = board.update_board(p_piece, t_tile)
+            if rmvd_p_info is not None:
+                loser = "White" if rmvd_p_info["color"] == "W" else "Black"
+                game.send(f"{loser} player loses: {rmvd_p_info['type']}\n")
+            board.move += 1
+            game.show()
+
+            loop = asyncio.get_running_loop()
+            game_over, reported = await loop.run_in_executor(
+                self.executor, board_status, board.to_fen())
+            for name, fields in reported:
+                game.events.emit(name, **fields)
+            # the FEN has no history, so repetitions are found here
+            if not game_over and board.draw_reason() == "repetition":
+                game.events.emit("repetition")
+                game_over = True
+            if game_over:
+                game.over = True
+                game.send("Game well played!\n")
+
+
+async def serve(host: str, port: int, workers: int, diff: bool = False):
+    # workers are started on demand, and forked ones would keep the
+    # sockets of the clients open after the server closes them
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=context) as executor:
+        chess_server = ChessServer(executor, diff)
+        server = await asyncio.start_server(chess_server.handle_client,
+                                            host, port)
+        print(f"Serving chess on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host chess games over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for checking the game state")
+    parser.add_argument("--diff", action="store_true",
+                        help="after the first board send only the squares "
+                             "that changed")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.diff))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,106 @@
+"""Endgame tables for a king and one piece against a lone king: KQK, KRK
+and KPK, made by retrograde.py. A table has one byte for every
+position, at
+
+    side to move << 18 | strong king << 12 | lone king << 6 | piece
+
+with the squares as row * 8 + col and the strong side playing white;
+positions with black as the strong side are looked up mirrored. A byte
+of 0 is a draw (or a position that cannot happen), otherwise it is the
+number of plies to mate plus one: odd plies mean the side to move
+mates, even plies that it gets mated. The tables are read through mmap.
+Castling is not taken into account. Two kings alone, or with a bishop
+or a knight, are always a draw and need no table.
+"""
+import mmap
+import os
+from bitboard import (COLORS, WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK,
+                      QUEEN, KING)
+
+WIN, DRAW, LOSS = 1, 0, -1
+TABLE_SIZE = 1 << 19
+# table name by the type code of the piece
+TABLES = {QUEEN: "kqk", ROOK: "krk", PAWN: "kpk"}
+
+DEFAULT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def table_index(stm: int, strong_king: int, lone_king: int, piece: int) -> int:
+    return stm << 18 | strong_king << 12 | lone_king << 6 | piece
+
+
+def decode(value: int) -> tuple:
+    """(result for the side to move, plies to mate) of a table byte
+    """
+    if not value:
+        return DRAW, 0
+    plies = value - 1
+    return (WIN if plies % 2 else LOSS), plies
+
+
+class Tablebase():
+    """Answers the positions of the tables found in directory. Missing
+    tables are left out.
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIR):
+        self.directory = directory
+        self.tables = None
+        self._files = []
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name + ".tb")
+
+    def _open(self):
+        self.tables = {}
+        for kind, name in TABLES.items():
+            path = self.path(name)
+            if not os.path.exists(path):
+                continue
+            file = open(path, "rb")
+            self._files.append(file)
+            self.tables[kind] = mmap.mmap(file.fileno(), 0,
+                                          access=mmap.ACCESS_READ)
+
+    def probe(self, board) -> tuple:
+        """(result, plies to mate) of a ChessBoard position for the side
+        to move, or None when no table has it
+        """
+        bitboards = board.bitboards
+        count = bitboards.all.bit_count()
+        if count > 3:
+            return None
+        if count == 2 or any(bitboards.pieces[side][kind]
+                             for side in (WHITE, BLACK)
+                             for kind in (KNIGHT, BISHOP)):
+            return DRAW, 0
+        if self.tables is None:
+            self._open()
+        for strong in (WHITE, BLACK):
+            for kind, table in self.tables.items():
+                piece = bitboards.pieces[strong][kind]
+                if not piece:
+                    continue
+                # mirror the rows when black is the strong side
+                flip = 56 if strong == BLACK else 0
+                stm = 0 if board.turn == COLORS[strong] else 1
+                index = table_index(
+                    stm,
+                    (bitboards.pieces[strong][KING].bit_length() - 1) ^ flip,
+                    (bitboards.pieces[1 - strong][KING].bit_length() - 1) ^
+                    flip,
+                    (piece.bit_length() - 1) ^ flip)
+                return decode(table[index])
+        return None
+
+    def close(self):
+        for table in (self.tables or {}).values():
+            table.close()
+        for file in self._files:
+            file.close()
+        self.tables = None
+        self._files = []
+
+
+# tables of the game, opened on the first probe
+tables = Tablebase()
@@ -0,0 +1,71 @@
+"""Checks of the diff mode of BoardRenderer.
+
+    python -m unittest test_renderer
+"""
+import io
+import re
+import unittest
+import chesspiece
+from chessboard import ChessBoard
+from renderer import BoardRenderer, MAX_LINES_BELOW
+
+# cursor up n lines, to column m
+PATCH = re.compile(r"\x1b\[(\d+)F\x1b\[(\d+)G")
+
+
+class DiffRenderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.board = ChessBoard(chesspiece.START_FEN)
+        self.board.make_board()
+        self.stream = io.StringIO()
+        self.renderer = BoardRenderer(self.stream, diff=True)
+        self.renderer.render(self.board)
+        self.frame_size = len(self._output())
+
+    def _output(self) -> str:
+        output = self.stream.getvalue()
+        self.stream.seek(0)
+        self.stream.truncate()
+        return output
+
+    def _move(self, origin: tuple, target: tuple):
+        self.board.update_board(origin, target, None, True)
+        self.board.move += 1
+        self.renderer.render(self.board)
+
+    def test_one_move_redraws_only_the_changed_tiles(self):
+        self._move((1, 4), (3, 4))
+        output = self._output()
+        # the move counter, e4 and e2, each from 1-based column of the tile
+        self.assertEqual(sorted(PATCH.findall(output)),
+                         [("14", "1"), ("4", "24"), ("6", "24")])
+        self.assertNotIn("\n", output)
+        self.assertLess(len(output), self.frame_size // 5)
+
+    def test_no_change_writes_nothing(self):
+        self.renderer.render(self.board)
+        self.assertEqual(self._output(), "")
+
+    def test_text_under_the_frame_is_skipped_over(self):
+        self.renderer.write_text("Move: white pawn at e2 to e4\n")
+        self._output()
+        self._move((1, 4), (3, 4))
+        self.assertEqual(sorted(PATCH.findall(self._output())),
+                         [("15", "1"), ("5", "24"), ("7", "24")])
+
+    def test_whole_frame_after_too_much_text(self):
+        self.renderer.write_text("line\n" * (MAX_LINES_BELOW + 1))
+        self._output()
+        self._move((1, 4), (3, 4))
+        self.assertEqual(len(self._output()), self.frame_size)
+        self.assertEqual(self.renderer.lines_below, 0)
+
+    def test_reset_draws_a_whole_frame(self):
+        self.renderer.reset()
+        self.renderer.render(self.board)
+        self.assertEqual(len(self._output()), self.frame_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
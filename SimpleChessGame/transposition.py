@@ -0,0 +1,103 @@
+import sys
+from collections import OrderedDict
+from typing import Any
+
+
+class TranspositionTable():
+    """Bounded cache for results computed from a position, keyed by
+    tuples starting with the ChessBoard position hash.
+
+    max_megabytes: memory cap for the stored entries
+    replacement: "lru" drops the least recently used entry when the cap
+    is reached, "depth" drops the shallowest of the oldest entries so
+    that results from deeper searches are kept longer.
+    """
+
+    # how many of the oldest entries "depth" replacement looks at
+    DEPTH_CANDIDATES = 8
+
+    def __init__(self, max_megabytes: float = 32, replacement: str = "lru"):
+        if replacement not in ("lru", "depth"):
+            raise ValueError(f"Unknown replacement scheme: {replacement}")
+        self.max_bytes = int(max_megabytes * 1024 * 1024)
+        self.replacement = replacement
+        self.entries = OrderedDict()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key: tuple) -> Any:
+        """Returns the stored value or None
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.replacement == "lru":
+            self.entries.move_to_end(key)
+        return entry[0]
+
+    def store(self, key: tuple, value: Any, depth: int = 0):
+        old_entry = self.entries.pop(key, None)
+        if old_entry is not None:
+            self.used_bytes -= old_entry[2]
+        size = self.entry_size(key, value)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (value, depth, size)
+        self.used_bytes += size
+        while self.used_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        if self.replacement == "lru":
+            _, entry = self.entries.popitem(last=False)
+        else:
+            candidates = []
+            for key, entry in self.entries.items():
+                candidates.append((entry[1], key))
+                if len(candidates) == self.DEPTH_CANDIDATES:
+                    break
+            _, key = min(candidates, key=lambda candidate: candidate[0])
+            entry = self.entries.pop(key)
+        self.used_bytes -= entry[2]
+        self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.used_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries),
+                "megabytes": round(self.used_bytes / (1024 * 1024), 3),
+                "max_megabytes": round(self.max_bytes / (1024 * 1024), 3),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions}
+
+    @staticmethod
+    def entry_size(*objects) -> int:
+        """Approximate memory taken by the objects, following lists,
+        tuples and dicts. Shared objects like small ints are not counted
+        separately, they are part of the container pointer size.
+        """
+        size = 0
+        stack = list(objects)
+        while stack:
+            item = stack.pop()
+            size += sys.getsizeof(item)
+            if isinstance(item, (list, tuple)):
+                stack.extend(element for element in item
+                             if isinstance(element, (list, tuple, dict)))
+            elif isinstance(item, dict):
+                stack.extend(element for element in item.values()
+                             if isinstance(element, (list, tuple, dict)))
+        return size
+
+
+# cache shared by the ChessBoards of one process unless given their own
+shared_table = TranspositionTable()
@@ -1,21 +1,41 @@
+import time
 import chessboard
 import chesspiece
+import events
+import gamestore
+import openingbook
+import search
+import tablebase
+from instrumentation import Profiler
+from renderer import format_line
 from colorama import init
 
 class UserInterface():
 
-    MENU_MESSAGE = """1) Play chess.\n2) Get chess moves from previous game.\n3) Exit.
-\nYour input: """
+    MENU_MESSAGE = """1) Play chess.\n2) Get chess moves from previous game.
+3) Play against computer.\n4) Exit.\n\nYour input: """
 
     WHITE_TURN_MSG = "White Player. Enter your move, for example: A2 to A3. To quit write 'quit'"
     BLACK_TURN_MSG = "Black Player. Enter your move, for example: A2 to A3. To quit write 'quit'"
     TURN_INPUT = "Starting tile, End tile: "
     INCORRECT_MSG = "Incorrect input: Please provide commands in format: column/row to column/row"
+    COLOR_INPUT = "Play as white or black (W/B): "
+    # seconds the computer can think per move
+    COMPUTER_TIME = 3
 
-    def __init__(self):
+    def __init__(self, profiler: Profiler = None):
         self.OPTIONS = {"1": self.play_chess,
                         "2": self.get_moves,
+                        "3": self.play_computer,
                         }
+        self.store = gamestore.GameStore()
+        # empty when no book has been built
+        self.book = openingbook.OpeningBook()
+        # the boards report their moves and checks here to be printed
+        self.events = events.EventHub()
+        self.events.subscribe(events.print_event)
+        # profiles every game and prints a summary after it when given
+        self.profiler = profiler
 
     @staticmethod
     def print_line(title: str, sepator: str,
@@ -29,81 +49,105 @@ class UserInterface():
          txt_lenght (lenght of the text)
 
         """
-        def if_rounded(txt_lenght):
-            """If a number would be rounded returns true
-            """
-            return round(number=txt_lenght, ndigits=None) < txt_lenght or \
-                round(number=txt_lenght, ndigits=None) > txt_lenght
-
-        txt_lenght = txt_lenght
-        txt_lenght -= len(title)
-        odd = if_rounded(txt_lenght/2)
-        txt_lenght = txt_lenght // 2
-        base_str = ""
-        if len(title) > 0:
-            for _ in range(1, txt_lenght):
-                base_str += fill_char
-            title = sepator.join([base_str, title])
-            title = sepator.join([title, base_str])
-            title += fill_char if odd else ''
-        else:
-            title = f''.join(f'{fill_char}'*txt_lenght*2)
-        print(title)
+        print(format_line(title, sepator, fill_char, txt_lenght))
 
-    def play_chess(self):
+    def play_chess(self, computer: str = None):
         """Handles the chessplay turns with player inputs and move checking,
         and board updating.
 
+        - computer : color played by the computer, None for two players
         - p_piece : player piece, current turns player piece
         - t_tile : target tile.
         - rmvd_p_info : if a piece was removed, its info otherwise None
+
+        The moves are stored with gamestore when the game ends.
         """
+        if self.profiler is not None:
+            self.profiler.enable()
 
-        board = chessboard.ChessBoard(chesspiece.chesspieces)
+        board = chessboard.ChessBoard(chesspiece.START_FEN,
+                                      events=self.events)
         board.make_board()
         turn_white = True
         white_player_pieces, black_player_pieces = board.get_pieces()
+        result = gamestore.UNFINISHED
 
         while (True):
             board.print_board()
             if board.check_board_state():
+                result = gamestore.result_of(board)
                 UserInterface.print_line("Game well played!", "@", "#", 39)
                 break
 
-            if turn_white:
-                print(UserInterface.WHITE_TURN_MSG)
-                player_input = input(UserInterface.TURN_INPUT)
-            else:
-                print(UserInterface.BLACK_TURN_MSG)
-                player_input = input(UserInterface.TURN_INPUT)
-            if player_input.lower() == "quit":
-                break
-            try:
-                p_piece, t_tile = UserInterface.parse_input(player_input)
-            except (IndexError, ValueError, TypeError) as _:
-                print(UserInterface.INCORRECT_MSG)
+            p_color = "W" if turn_white else "B"
+            if p_color == computer:
+                p_piece, t_tile, promotion = UserInterface.computer_move(
+                    board, self.book)
             else:
-                p_color = "W" if turn_white else "B"
-                piece = board.state[p_piece[0]][p_piece[1]]
-                if piece is not None:
-                    if piece.check_move(t_tile, board.state, p_color):
-                        rmvd_p_info = board.update_board(p_piece, t_tile)
-                        if rmvd_p_info is not None:
-                            if turn_white:
-                                black_player_pieces.remove(rmvd_p_info)
-                                print(f"Black player loses: {rmvd_p_info['type']}")
-                            else:
-                                white_player_pieces.remove(rmvd_p_info)
-                                print(f"White player loses: {rmvd_p_info['type']}")
-                        turn_white = not turn_white
-                        board.move += 1
-                    else:
-                        print(f"Cannot move {piece.get_info()['type']}", end=" ")
-                        print(f"to {piece.chess_format(t_tile)}")
+                if turn_white:
+                    print(UserInterface.WHITE_TURN_MSG)
+                    player_input = input(UserInterface.TURN_INPUT)
                 else:
+                    print(UserInterface.BLACK_TURN_MSG)
+                    player_input = input(UserInterface.TURN_INPUT)
+                if player_input.lower() == "quit":
+                    break
+                try:
+                    p_piece, t_tile = UserInterface.parse_input(player_input)
+                except (IndexError, ValueError, TypeError) as _:
+                    print(UserInterface.INCORRECT_MSG)
+                    continue
+                piece = board.state[p_piece[0]][p_piece[1]]
+                if piece is None:
                     print(f"Board index is empty - Nothing to move")
+                    continue
+                if not piece.check_move(t_tile, board.state, p_color):
+                    print(f"Cannot move {piece.get_info()['type']}", end=" ")
+                    print(f"to {piece.chess_format(t_tile)}")
+                    continue
+                promotion = None
+
+            rmvd_p_info = board.update_board(p_piece, t_tile, promotion)
+            if rmvd_p_info is not None:
+                if turn_white:
+                    black_player_pieces.remove(rmvd_p_info)
+                    print(f"Black player loses: {rmvd_p_info['type']}")
+                else:
+                    white_player_pieces.remove(rmvd_p_info)
+                    print(f"White player loses: {rmvd_p_info['type']}")
+            turn_white = not turn_white
+            board.move += 1
+        moves = gamestore.moves_of(board)
+        if moves:
+            self.store.append(moves, result)
+        if self.profiler is not None:
+            self.profiler.end_game()
+            self.profiler.disable()
+            print(self.profiler.summary())
         UserInterface.print_line("Back to menu", ' ', '-', 39)
 
+    def play_computer(self):
+        color = input(UserInterface.COLOR_INPUT).strip().upper()
+        if color not in ("W", "B"):
+            print("Please select W or B.")
+            return
+        self.play_chess(computer="B" if color == "W" else "W")
+
+    @staticmethod
+    def computer_move(board: chessboard.ChessBoard,
+                      book: openingbook.OpeningBook = None) -> tuple:
+        """Plays a book move, or searches the move of the computer
+        within COMPUTER_TIME
+        """
+        found = search.Search(board, UserInterface.COMPUTER_TIME,
+                              book=book, tablebase=tablebase.tables).search()
+        print(f"Computer plays {search.move_name(found['move'])}", end=" ")
+        if found["book"]:
+            print("(book)")
+        else:
+            print(f"(depth {found['depth']}, {found['nps']:.0f} nodes/s)")
+        return found["move"]
+
     @staticmethod
     def parse_input(input: str) -> tuple[tuple]:
 
@@ -126,16 +170,43 @@ class UserInterface():
         return ((start_row, start_column), (end_row, end_column))
 
     def get_moves(self):
-        print("To be implemented")
+        """Lists the number of stored games and replays the chosen one
+        move by move, printing the final board
+        """
+        games = len(self.store)
+        if not games:
+            print("No games played yet.")
+            return
+        print(f"{games} games stored.")
+        try:
+            number = int(input(f"Game to replay (1-{games}): ")) - 1
+            header = self.store.header(number)
+        except (ValueError, IndexError) as _:
+            print(f"Please select between 1-{games}.")
+            return
+
+        played = time.strftime("%Y-%m-%d %H:%M",
+                               time.localtime(header['played']))
+        print(f"Game {number + 1}, played {played},", end=" ")
+        print(f"{header['moves']} moves,", end=" ")
+        print(f"{gamestore.RESULTS[header['result']]}")
+        board = chessboard.ChessBoard(chesspiece.START_FEN,
+                                      events=self.events)
+        board.make_board()
+        for origin, target, promotion in self.store.game(number):
+            board.update_board(origin, target, promotion)
+            board.move += 1
+        board.print_board()
+        UserInterface.print_line("Back to menu", ' ', '-', 39)
 
     def program_flow(self):
         init()
         UserInterface.print_line("Welcome to Simple Chess!", " ", "*", 39)
-        while (option := input(UserInterface.MENU_MESSAGE)) != "3":
+        while (option := input(UserInterface.MENU_MESSAGE)) != "4":
             try:
                 self.OPTIONS[option]()
             except KeyError:
-                print("Please select between 1-3.")
+                print("Please select between 1-4.")
         UserInterface.print_line("Goodbye", " ", "#", 39)
 
 
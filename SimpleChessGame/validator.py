@@ -0,0 +1,123 @@
+"""Batch validation of games. Every move is checked with
+Piece.check_move() and every position after it with
+ChessBoard.check_board_state(). The games are spread over a process
+pool and the results come back in the order of the games.
+
+    python validator.py games.pgn
+    python validator.py --store --workers 16
+"""
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+import chesspiece
+import gamestore
+import pgn
+from chessboard import ChessBoard
+
+
+def validate_game(moves: list, fen: str = chesspiece.START_FEN) -> dict:
+    """Plays the moves on a new board set up from fen. Moves are
+    (origin, target, promotion) tuples or SAN strings. Returns the
+    number of valid moves, whether the game ended and the first error,
+    if any.
+    """
+    board = ChessBoard(fen)
+    try:
+        board.make_board()
+    except ValueError as exception:
+        return {"valid": False, "moves": 0, "game_over": False,
+                "error": str(exception)}
+    game_over = False
+    error = None
+    valid = 0
+    for number, move in enumerate(moves, start=1):
+        if game_over:
+            error = f"move {number}: the game is already over"
+            break
+        try:
+            if isinstance(move, str):
+                move = pgn.san_to_move(board, move)
+        except ValueError as exception:
+            error = f"move {number}: {exception}"
+            break
+        origin, target, promotion = move
+        piece = board.state[origin[0]][origin[1]]
+        if piece is None:
+            error = f"move {number}: no piece at {origin}"
+            break
+        if not piece.check_move(target, board.state, board.turn, True):
+            error = f"move {number}: {piece.TYPE} cannot move to {target}"
+            break
+        if not any(move[:2] == (origin, target)
+                   for move in board.legal_moves()):
+            error = f"move {number}: leaves the king in check"
+            break
+        board.update_board(origin, target, promotion, True)
+        board.move += 1
+        valid += 1
+        # a draw by repetition or 50 moves has to be claimed, so the
+        # players may play on
+        game_over = board.check_board_state(True) and \
+            board.draw_reason() is None
+    return {"valid": error is None, "moves": valid, "game_over": game_over,
+            "error": error}
+
+
+def validate_games(games: Iterator[tuple], workers: int = None,
+                   chunksize: int = 64) -> Iterator[dict]:
+    """Yields the validate_game() result of each game, given as (moves,
+    FEN of the start position) pairs, in order. The games are sent to
+    the pool in batches, so only a few batches are in memory at a time.
+    """
+    workers = workers or os.cpu_count()
+    batch_size = workers * chunksize * 4
+    games = iter(games)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while batch := list(itertools.islice(games, batch_size)):
+            moves, fens = zip(*batch)
+            yield from executor.map(validate_game, moves, fens,
+                                    chunksize=chunksize)
+
+
+def pgn_games(path: str) -> Iterator[tuple]:
+    """(moves, FEN) of the games of a PGN file, starting from the FEN
+    tag position when a game has one
+    """
+    with open(path, encoding="utf-8", errors="replace") as pgn_file:
+        for game in pgn.read_games(pgn_file):
+            yield game["moves"], game["tags"].get("FEN", chesspiece.START_FEN)
+
+
+def stored_games(store: gamestore.GameStore) -> Iterator[tuple]:
+    for number in range(len(store)):
+        yield store.game(number), chesspiece.START_FEN
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate every move of "
+                                                 "many games")
+    parser.add_argument("path", nargs="?", help="PGN file")
+    parser.add_argument("--store", action="store_true",
+                        help="validate the games of the game store")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=64)
+    args = parser.parse_args()
+    if args.store == bool(args.path):
+        parser.error("give either a PGN file or --store")
+
+    games = stored_games(gamestore.GameStore()) if args.store \
+        else pgn_games(args.path)
+    start = time.perf_counter()
+    count = invalid = 0
+    for number, result in enumerate(
+            validate_games(games, args.workers, args.chunksize), start=1):
+        count += 1
+        if not result["valid"]:
+            invalid += 1
+            print(f"Game {number}: {result['error']}")
+    elapsed = time.perf_counter() - start
+    print(f"{count} games, {invalid} invalid, in {elapsed:.2f} s,", end=" ")
+    print(f"{count / elapsed if elapsed > 0 else 0:.1f} games/s")
@@ -0,0 +1,34 @@
+"""Zobrist keys for hashing ChessBoard positions into 64-bit integers.
+The keys come from a fixed seed, so the hash of a position is the same
+in every run and can be stored on disk.
+"""
+import random
+
+_random = random.Random(20231018)
+
+# PIECE_KEYS[color code][type code][square]
+PIECE_KEYS = [[[_random.getrandbits(64) for _ in range(64)]
+               for _ in range(6)] for _ in range(2)]
+# xored in when black is to move
+SIDE_KEY = _random.getrandbits(64)
+# one key for each combination of the four castling right bits
+CASTLING_KEYS = [_random.getrandbits(64) for _ in range(16)]
+# en passant tile, by column
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(8)]
+
+
+def hash_position(state: list, turn: str, castling: int,
+                  en_passant: tuple) -> int:
+    """Computes the hash of a position from scratch
+    """
+    key = 0
+    for row_index, row in enumerate(state):
+        for col, piece in enumerate(row):
+            if piece is not None:
+                key ^= PIECE_KEYS[piece.side][piece.KIND][row_index * 8 + col]
+    if turn == "B":
+        key ^= SIDE_KEY
+    key ^= CASTLING_KEYS[castling]
+    if en_passant is not None:
+        key ^= EN_PASSANT_KEYS[en_passant[1]]
+    return key